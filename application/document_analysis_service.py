@@ -1,14 +1,41 @@
 """Document analysis and frame/segment search service"""
-from typing import List, Optional, Callable
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Callable, Iterator
+import numpy as np
 from domain import IDocumentSource, ISearchEngine, ILogger, ScenarioBlock, VisualFrame, SearchResult, VideoSegment
 import traceback
 
 
-from infrastructure.localization import _
+from infrastructure.localization import _, get_template
+
+_DEBUG = os.environ.get("DA_DEBUG") == "1"
+_TAG_CACHE_SIZE = 512
+_RESULT_BATCH_SIZE = 16
+_RESULT_FLUSH_INTERVAL = 0.1
+_SEARCH_CHUNK_SIZE = 32
+_VECTORIZED_HISTORY_MIN = 64
 
 class DocumentAnalysisService:
     """Coordinates document analysis and frame search"""
     
+    __slots__ = (
+        'document_source',
+        'search_engine',
+        'logger',
+        'score_threshold',
+        'history_size',
+        'time_window',
+        'used_frames_history',
+        '_history_by_file',
+        '_tag_cache',
+        '_hist_files',
+        '_hist_times',
+        '_hist_pos',
+    )
+    
     def __init__(
         self,
         document_source: IDocumentSource,
@@ -24,7 +51,15 @@ class DocumentAnalysisService:
         self.score_threshold = score_threshold
         self.history_size = history_size
         self.time_window = time_window
-        self.used_frames_history: List[tuple[str, float]] = []
+        self.used_frames_history: deque[tuple[str, float]] = deque(maxlen=history_size)
+        self._history_by_file: dict[str, list[float]] = {}
+        self._hist_files: Optional[np.ndarray] = None
+        self._hist_times: Optional[np.ndarray] = None
+        self._hist_pos = 0
+        if history_size > _VECTORIZED_HISTORY_MIN:
+            self._hist_files = np.full(history_size, None, dtype=object)
+            self._hist_times = np.zeros(history_size, dtype=np.float64)
+        self._tag_cache: OrderedDict[str, List[str]] = OrderedDict()
     
     def analyze_document(
         self,
@@ -45,95 +80,176 @@ class DocumentAnalysisService:
         if progress_callback:
             progress_callback("status", _("analysis_blocks_found", count=total_blocks))
         
-        print(_("debug_start_processing_blocks", count=total_blocks))
+        if _DEBUG:
+            print(_("debug_start_processing_blocks", count=total_blocks))
+
+        tpl_processing_block = get_template("analysis_processing_block")
+        tpl_block_start = get_template("debug_block_start")
+        tpl_block_success = get_template("debug_block_success")
 
-        for idx, block in enumerate(blocks, 1):
-            print(_("debug_block_start", idx=idx, snippet=block.text[:20]))
+        pending_results: List[dict] = []
+        last_flush = time.monotonic()
+
+        block_searches = self._iter_block_searches(blocks)
+        for idx, (block, segment_results, search_results) in enumerate(block_searches, 1):
+            block_snippet = block.text[:20]
+            if _DEBUG:
+                print(tpl_block_start.format(idx=idx, snippet=block_snippet))
 
             if progress_callback:
                 progress_callback(
                     "status", 
-                    _("analysis_processing_block", idx=idx, total=total_blocks)
+                    tpl_processing_block.format(idx=idx, total=total_blocks)
                 )
             
             try:
-                result = self._process_block(block)
+                result = self._process_block(block, block_snippet, segment_results, search_results)
                 
                 if result:
                     results.append(result)
                     if progress_callback:
-                        progress_callback("result_found", self._result_to_dict(result))
+                        pending_results.append(self._result_to_dict(result))
+                        now = time.monotonic()
+                        if (len(pending_results) >= _RESULT_BATCH_SIZE
+                                or now - last_flush > _RESULT_FLUSH_INTERVAL):
+                            progress_callback("results_batch", pending_results)
+                            pending_results = []
+                            last_flush = now
                 
-                print(_("debug_block_success", idx=idx))
+                if _DEBUG:
+                    print(tpl_block_success.format(idx=idx))
 
-            except Exception as e:
-                print(_("error_critical_on_block", idx=idx))
-                print(_("error_message_label", error=e))
-                print(_("error_traceback_start"))
-                traceback.print_exc()
-                print(_("error_traceback_end"))
+            except Exception:
+                self._report_block_error(idx)
 
-        print(_("debug_processing_finished"))
+        if _DEBUG:
+            print(_("debug_processing_finished"))
 
         if progress_callback:
+            if pending_results:
+                progress_callback("results_batch", pending_results)
             progress_callback("finished", None)
         
         return results
 
-    def _process_block(self, block: ScenarioBlock) -> Optional[SearchResult]:
-        """Обрабатывает один блок сценария (Стратегія: Унікальний > Дублікат > Нічого)"""
-        block_snippet = block.text[:20] + "..."
-        print(_("debug_process_block_start", snippet=block_snippet))
+    def _iter_block_searches(
+        self,
+        blocks: List[ScenarioBlock]
+    ) -> Iterator[tuple[ScenarioBlock, List[tuple[VideoSegment, float]], List[tuple[VisualFrame, float]]]]:
+        """Yields search results per block, searching the next chunk in background while the current one is processed"""
+        chunks = [blocks[i:i + _SEARCH_CHUNK_SIZE] for i in range(0, len(blocks), _SEARCH_CHUNK_SIZE)]
+        if not chunks:
+            return
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(self._search_blocks, chunks[0])
+            for chunk_idx, chunk in enumerate(chunks):
+                try:
+                    segment_results, frame_results = pending.result()
+                except Exception:
+                    self._report_block_error(chunk_idx * _SEARCH_CHUNK_SIZE + 1)
+                    segment_results, frame_results = self._search_blocks_one_by_one(
+                        chunk, chunk_idx * _SEARCH_CHUNK_SIZE + 1
+                    )
+                if chunk_idx + 1 < len(chunks):
+                    pending = executor.submit(self._search_blocks, chunks[chunk_idx + 1])
+                
+                for offset, block in enumerate(chunk):
+                    yield block, segment_results[offset], frame_results.get(offset, [])
+
+    def _search_blocks(
+        self,
+        blocks: List[ScenarioBlock]
+    ) -> tuple[List[List[tuple[VideoSegment, float]]], dict[int, List[tuple[VisualFrame, float]]]]:
+        """Runs batched segment search for all blocks and frame search for blocks without segments"""
+        texts = [block.text for block in blocks]
+        segment_results = self.search_engine.batch_search_segments(texts, limit=12)
         
-        segment_results = self.search_engine.search_segments(block.text, limit=12)
+        missing = [i for i, results in enumerate(segment_results) if not results]
+        if not missing:
+            return segment_results, {}
+        
+        frame_results = self.search_engine.batch_search([texts[i] for i in missing], limit=12)
+        return segment_results, dict(zip(missing, frame_results))
+
+    def _search_blocks_one_by_one(
+        self,
+        blocks: List[ScenarioBlock],
+        first_idx: int
+    ) -> tuple[List[List[tuple[VideoSegment, float]]], dict[int, List[tuple[VisualFrame, float]]]]:
+        """Falls back to per-block search after a failed batch; failing blocks get empty results"""
+        segment_results = []
+        frame_results = {}
+        for offset, block in enumerate(blocks):
+            try:
+                segments = self.search_engine.search_segments(block.text, limit=12)
+                if not segments:
+                    frame_results[offset] = self.search_engine.search(block.text, limit=12)
+            except Exception:
+                self._report_block_error(first_idx + offset)
+                segments = []
+            segment_results.append(segments)
+        return segment_results, frame_results
+
+    def _report_block_error(self, idx: int) -> None:
+        """Logs block failure with traceback"""
+        if self.logger:
+            self.logger.exception(_("error_critical_on_block", idx=idx))
+        elif _DEBUG:
+            print(_("error_critical_on_block", idx=idx))
+            traceback.print_exc()
+
+    def _process_block(
+        self,
+        block: ScenarioBlock,
+        block_snippet: str,
+        segment_results: List[tuple[VideoSegment, float]],
+        search_results: List[tuple[VisualFrame, float]]
+    ) -> Optional[SearchResult]:
+        """Обрабатывает один блок сценария (Стратегія: Унікальний > Дублікат > Нічого)"""
+        if _DEBUG:
+            print(_("debug_process_block_start", snippet=block_snippet))
         
         if segment_results:
             return self._process_segment_results(block, segment_results, block_snippet)
         
-        search_results = self.search_engine.search(block.text, limit=12)
-        
         if not search_results:
-             print(_("debug_neural_found_nothing", snippet=block_snippet))
-             return None
+            if _DEBUG:
+                print(_("debug_neural_found_nothing", snippet=block_snippet))
+            return None
 
         absolute_best_frame, absolute_best_score = search_results[0]
-        print(_("debug_plan_b_candidate", snippet=block_snippet, filename=absolute_best_frame.video_filename, score=absolute_best_score))
+        if _DEBUG:
+            print(_("debug_plan_b_candidate", snippet=block_snippet, filename=absolute_best_frame.video_filename, score=absolute_best_score))
+
+        threshold = self.score_threshold
+        if absolute_best_score < threshold:
+            if _DEBUG:
+                print(_("debug_nothing_fit", snippet=block_snippet))
+            return None
 
         unique_frame = None
         unique_score = 0.0
         
+        is_duplicate = self._is_duplicate
         for frame, score in search_results:
-            if score < self.score_threshold:
+            if score < threshold:
                 break 
             
-            if not self._is_duplicate(frame):
+            if not is_duplicate(frame):
                 unique_frame = frame
                 unique_score = score
-                print(_("debug_unique_found", snippet=block_snippet, score=score))
+                if _DEBUG:
+                    print(_("debug_unique_found", snippet=block_snippet, score=score))
                 break
 
-        final_frame = None
-        final_score = 0.0
-        took_duplicate = False
+        if unique_frame is not None:
+            self._record(unique_frame.video_filename, unique_frame.timestamp)
+            return self._create_search_result(block, unique_frame, unique_score)
 
-        if unique_frame:
-            final_frame = unique_frame
-            final_score = unique_score
-        elif absolute_best_score >= self.score_threshold:
-            final_frame = absolute_best_frame
-            final_score = absolute_best_score
-            took_duplicate = True
+        if _DEBUG:
             print(_("debug_taking_duplicate", snippet=block_snippet))
-        else:
-             print(_("debug_nothing_fit", snippet=block_snippet))
-
-        if final_frame:
-            if not took_duplicate:
-                self._add_to_history(final_frame)
-            
-            return self._create_search_result(block, final_frame, final_score)
-        
-        return None
+        return self._create_search_result(block, absolute_best_frame, absolute_best_score)
     
     def _process_segment_results(
         self, 
@@ -143,73 +259,89 @@ class DocumentAnalysisService:
     ) -> Optional[SearchResult]:
         """Обрабатывает результаты поиска сегментов"""
         absolute_best_segment, absolute_best_score = segment_results[0]
-        print(_("debug_plan_b_candidate", snippet=block_snippet, filename=absolute_best_segment.video_filename, score=absolute_best_score))
+        if _DEBUG:
+            print(_("debug_plan_b_candidate", snippet=block_snippet, filename=absolute_best_segment.video_filename, score=absolute_best_score))
+
+        threshold = self.score_threshold
+        if absolute_best_score < threshold:
+            if _DEBUG:
+                print(_("debug_nothing_fit", snippet=block_snippet))
+            return None
 
         unique_segment = None
         unique_score = 0.0
+        unique_middle = 0.0
         
+        is_duplicate = self._is_duplicate_segment
         for segment, score in segment_results:
-            if score < self.score_threshold:
+            if score < threshold:
                 break 
             
-            if not self._is_duplicate_segment(segment):
+            middle_time = segment.get_middle_timestamp()
+            if not is_duplicate(segment, middle_time):
                 unique_segment = segment
                 unique_score = score
-                print(_("debug_unique_found", snippet=block_snippet, score=score))
+                unique_middle = middle_time
+                if _DEBUG:
+                    print(_("debug_unique_found", snippet=block_snippet, score=score))
                 break
 
-        final_segment = None
-        final_score = 0.0
-        took_duplicate = False
+        if unique_segment is not None:
+            self._record(unique_segment.video_filename, unique_middle)
+            return self._create_search_result_from_segment(block, unique_segment, unique_score, unique_middle)
 
-        if unique_segment:
-            final_segment = unique_segment
-            final_score = unique_score
-        elif absolute_best_score >= self.score_threshold:
-            final_segment = absolute_best_segment
-            final_score = absolute_best_score
-            took_duplicate = True
+        if _DEBUG:
             print(_("debug_taking_duplicate", snippet=block_snippet))
-        else:
-             print(_("debug_nothing_fit", snippet=block_snippet))
-
-        if final_segment:
-            if not took_duplicate:
-                self._add_segment_to_history(final_segment)
-            
-            return self._create_search_result_from_segment(block, final_segment, final_score)
-        
-        return None
+        return self._create_search_result_from_segment(block, absolute_best_segment, absolute_best_score)
         
     def _is_duplicate(self, frame: VisualFrame) -> bool:
         """Проверяет, является ли кадр дубликатом"""
-        for used_file, used_time in self.used_frames_history:
-            if (frame.video_filename == used_file and 
-                abs(frame.timestamp - used_time) < self.time_window):
-                return True
-        return False
+        if not self.used_frames_history:
+            return False
+        return self._is_used(frame.video_filename, frame.timestamp)
     
-    def _is_duplicate_segment(self, segment: VideoSegment) -> bool:
+    def _is_duplicate_segment(self, segment: VideoSegment, middle_time: Optional[float] = None) -> bool:
         """Проверяет, является ли сегмент дубликатом"""
-        middle_time = segment.get_middle_timestamp()
-        for used_file, used_time in self.used_frames_history:
-            if (segment.video_filename == used_file and 
-                abs(middle_time - used_time) < self.time_window):
-                return True
-        return False
+        if not self.used_frames_history:
+            return False
+        if middle_time is None:
+            middle_time = segment.get_middle_timestamp()
+        return self._is_used(segment.video_filename, middle_time)
+    
+    def _is_used(self, filename: str, timestamp: float) -> bool:
+        """Checks whether a position of the video is within time window of a used one"""
+        if self._hist_files is not None:
+            mask = (self._hist_files == filename) & (np.abs(self._hist_times - timestamp) < self.time_window)
+            return bool(mask.any())
+        
+        times = self._history_by_file.get(filename)
+        if times is None:
+            return False
+        time_window = self.time_window
+        return any(abs(timestamp - used_time) < time_window for used_time in times)
     
-    def _add_to_history(self, frame: VisualFrame) -> None:
-        """Добавляет кадр в историю использованных"""
-        self.used_frames_history.append((frame.video_filename, frame.timestamp))
-        if len(self.used_frames_history) > self.history_size:
-            self.used_frames_history.pop(0)
+    def _record(self, filename: str, timestamp: float) -> None:
+        """Adds used frame/segment position to history"""
+        if self.history_size <= 0:
+            return
+        if self._hist_files is not None:
+            self._hist_files[self._hist_pos] = filename
+            self._hist_times[self._hist_pos] = timestamp
+            self._hist_pos = (self._hist_pos + 1) % self.history_size
+            self.used_frames_history.append((filename, timestamp))
+            return
+        if len(self.used_frames_history) == self.history_size:
+            self._evict_oldest()
+        self.used_frames_history.append((filename, timestamp))
+        self._history_by_file.setdefault(filename, []).append(timestamp)
     
-    def _add_segment_to_history(self, segment: VideoSegment) -> None:
-        """Добавляет сегмент в историю использованных"""
-        middle_time = segment.get_middle_timestamp()
-        self.used_frames_history.append((segment.video_filename, middle_time))
-        if len(self.used_frames_history) > self.history_size:
-            self.used_frames_history.pop(0)
+    def _evict_oldest(self) -> None:
+        """Drops the oldest history entry from the per-file index"""
+        old_file, old_time = self.used_frames_history.popleft()
+        times = self._history_by_file[old_file]
+        times.remove(old_time)
+        if not times:
+            del self._history_by_file[old_file]
     
     def _create_search_result(
         self,
@@ -222,10 +354,10 @@ class DocumentAnalysisService:
         s = int(frame.timestamp % 60)
         timecode = f"{m:02d}:{s:02d}"
         
-        tags = self.search_engine.extract_tags(block.text)
+        tags = self._get_tags(block.text)
         
         return SearchResult(
-            scenario_text_snippet=block.text[:100] + "..." if len(block.text) > 100 else block.text,
+            scenario_text_snippet=self._text_snippet(block.text),
             video_filename=frame.video_filename,
             timecode_str=timecode,
             timestamp_seconds=frame.timestamp,
@@ -238,18 +370,20 @@ class DocumentAnalysisService:
         self,
         block: ScenarioBlock,
         segment: VideoSegment,
-        score: float
+        score: float,
+        middle_time: Optional[float] = None
     ) -> SearchResult:
         """Создает объект результата поиска из сегмента"""
-        middle_time = segment.get_middle_timestamp()
+        if middle_time is None:
+            middle_time = segment.get_middle_timestamp()
         m = int(middle_time // 60)
         s = int(middle_time % 60)
         timecode = f"{m:02d}:{s:02d}"
         
-        tags = self.search_engine.extract_tags(block.text)
+        tags = self._get_tags(block.text)
         
         return SearchResult(
-            scenario_text_snippet=block.text[:100] + "..." if len(block.text) > 100 else block.text,
+            scenario_text_snippet=self._text_snippet(block.text),
             video_filename=segment.video_filename,
             timecode_str=timecode,
             timestamp_seconds=middle_time,
@@ -261,6 +395,26 @@ class DocumentAnalysisService:
             segment_id=segment.segment_id
         )
     
+    @staticmethod
+    def _text_snippet(text: str) -> str:
+        """Returns text shortened to 100 characters for display"""
+        if len(text) <= 100:
+            return text
+        return text[:100] + "..."
+    
+    def _get_tags(self, text: str) -> List[str]:
+        """Returns tags for text, reusing results for repeated blocks"""
+        tags = self._tag_cache.get(text)
+        if tags is not None:
+            self._tag_cache.move_to_end(text)
+            return tags
+        
+        tags = self.search_engine.extract_tags(text)
+        self._tag_cache[text] = tags
+        if len(self._tag_cache) > _TAG_CACHE_SIZE:
+            self._tag_cache.popitem(last=False)
+        return tags
+    
     def _result_to_dict(self, result: SearchResult) -> dict:
         """Преобразует результат в словарь для GUI"""
         return {
@@ -281,14 +435,13 @@ class DocumentAnalysisService:
         """Записывает обратную связь"""
         try:
             if "segment_id" in frame_meta and frame_meta.get("segment_id"):
-                from domain import VideoSegment
                 segment = VideoSegment(
                     video_filename=frame_meta.get("filename", ""),
                     start_time=float(frame_meta.get("start_time", 0)),
                     end_time=float(frame_meta.get("end_time", 0)),
                     segment_id=frame_meta.get("segment_id", ""),
                     preview_frame_path=frame_meta.get("frame_path", ""),
-                    key_frames=[]
+                    key_frames=()
                 )
                 self.search_engine.record_segment_feedback(segment, is_positive)
             else:
@@ -1,24 +1,87 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+
+def _walk_size(root: str) -> int:
+    """Sums sizes of regular files under root using a single scandir pass per directory"""
+    total = 0
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                        elif entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total
+
+
+def _split_top_level(root: str) -> tuple[int, List[str]]:
+    """Returns size of files directly in root and list of its subdirectories"""
+    files_size = 0
+    subdirs: List[str] = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        files_size += entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return files_size, subdirs
+
+
+def _remove_path(path: str, is_dir: bool) -> Optional[Exception]:
+    """Removes file or directory tree, returning the error instead of raising"""
+    try:
+        if is_dir:
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        return e
+    return None
+
 
 class StorageService:
     """Manages local project file storage"""
 
-    def __init__(self, base_dir: str = "."):
+    def __init__(self, base_dir: str = ".", clear_workers: Optional[int] = None):
         self.base_path = Path(base_dir)
+        self.clear_workers = clear_workers or (os.cpu_count() or 1) * 4
         self.media_path = self.base_path / "source_videos"
         self.data_path = self.base_path / "data"
 
         self.dirs_to_clean: List[Path] = [
             self.media_path,
             self.data_path / "frames",
+            self.data_path / "scene_cache",
         ]
         
         self.files_to_remove: List[Path] = [
             self.data_path / "feedback.json",
+            self.data_path / "feedback.jsonl",
             self.data_path / "visual_db.json",
+            self.data_path / ".last_index_mtime",
+            self.data_path / "clip_text.onnx",
+            self.data_path / "clip_text.onnx.json",
+            self.data_path / "clip_text_frozen.pt",
+            self.data_path / "clip_text_frozen.pt.json",
         ]
 
         self._ensure_dirs_exist()
@@ -31,41 +94,48 @@ class StorageService:
     def get_total_size_bytes(self) -> int:
         """Calculates total size of files in media and data folders in bytes"""
         total_size = 0
+        subdirs: List[str] = []
         
         targets = [self.media_path, self.data_path]
         for target_dir in targets:
-            if target_dir.exists():
-                for p in target_dir.rglob('*'):
-                    if p.is_file():
-                        try:
-                            total_size += p.stat().st_size
-                        except OSError:
-                            pass
+            files_size, target_subdirs = _split_top_level(str(target_dir))
+            total_size += files_size
+            subdirs.extend(target_subdirs)
+        
+        if not subdirs:
+            return total_size
+        
+        with ThreadPoolExecutor(max_workers=min(16, len(subdirs))) as executor:
+            total_size += sum(executor.map(_walk_size, subdirs))
         return total_size
 
     def clear_project_storage(self) -> bool:
         """Clears working folders and removes database files. Returns True on success"""
         success = True
+        removal_plan: List[tuple[str, bool]] = []
         
         for folder in self.dirs_to_clean:
-            if folder.exists():
-                for item in folder.iterdir():
-                    try:
-                        if item.is_file() or item.is_symlink():
-                            item.unlink()
-                        elif item.is_dir():
-                            shutil.rmtree(item)
-                    except Exception as e:
-                        print(f"[Storage] Error deleting {item}: {e}")
-                        success = False
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        removal_plan.append((entry.path, entry.is_dir(follow_symlinks=False)))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[Storage] Error deleting {folder}: {e}")
+                success = False
         
         for file_path in self.files_to_remove:
-            try:
-                if file_path.exists():
-                    file_path.unlink()
-            except Exception as e:
-                 print(f"[Storage] Error deleting file {file_path}: {e}")
-                 success = False
+            removal_plan.append((str(file_path), False))
+        
+        if removal_plan:
+            workers = min(self.clear_workers, len(removal_plan))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                errors = executor.map(lambda item: _remove_path(*item), removal_plan)
+                for (path, _is_dir), error in zip(removal_plan, errors):
+                    if error is not None:
+                        print(f"[Storage] Error deleting {path}: {error}")
+                        success = False
                  
         self._ensure_dirs_exist()
-        return success
\ No newline at end of file
+        return success
@@ -1,8 +1,44 @@
 """Video indexing service"""
+import itertools
 import os
-from typing import List
-from domain import IVideoIndexer, IFrameRepository, VisualFrame, VideoSegment
-from infrastructure.localization import _
+import queue
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional, Tuple
+from domain import IVideoIndexer, IFrameRepository, ILogger, VisualFrame, VideoSegment
+from infrastructure.localization import _, get_template
+
+_VIDEO_EXTS = frozenset({'.mp4', '.mov', '.mkv'})
+_WRITE_QUEUE_SIZE = 2
+
+
+def _scan_videos(folder: str) -> Iterator[str]:
+    """Yields names of video files in folder"""
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in _VIDEO_EXTS:
+                yield entry.name
+
+
+def _index_one(
+    indexer: IVideoIndexer,
+    full_path: str,
+    target_fps: Optional[float] = None,
+    stream_frames: bool = False
+) -> Tuple[Optional[str], Iterable]:
+    """Extracts segments (or frames as fallback) for one video; frames stay a lazy iterator if stream_frames"""
+    segments = indexer.extract_segments(full_path, target_fps=target_fps)
+    if segments:
+        return "segments", segments
+    frames = indexer.iter_frames(full_path, target_fps=target_fps)
+    first = next(frames, None)
+    if first is None:
+        return None, []
+    if stream_frames:
+        return "frames", itertools.chain([first], frames)
+    return "frames", [first, *frames]
+
 
 class VideoIndexingService:
     """Manages video indexing process"""
@@ -11,68 +47,217 @@ class VideoIndexingService:
         self,
         indexer: IVideoIndexer,
         repository: IFrameRepository,
-        video_folder: str = "source_videos"
+        video_folder: str = "source_videos",
+        workers: int = 0,
+        checkpoint_every: int = 20,
+        logger: Optional[ILogger] = None,
+        state_file: str = "data/.last_index_mtime",
+        target_fps: Optional[float] = None,
+        executor: str = "thread"
     ):
         self.indexer = indexer
         self.repository = repository
+        self.logger = logger
         self.video_folder = os.path.abspath(video_folder)
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.state_file = state_file
+        self.target_fps = target_fps
+        self.executor = executor
+        self._pending_segments: List[VideoSegment] = []
+        self._pending_files: List[str] = []
+        self._failed_files: set = set()
+        self._write_queue: Optional[queue.Queue] = None
         self._ensure_video_folder()
     
+    def _info(self, message: str) -> None:
+        """Reports progress via logger or stdout"""
+        if self.logger:
+            self.logger.info(message)
+        else:
+            print(message)
+    
     def _ensure_video_folder(self) -> None:
         """Creates video folder if it doesn't exist"""
-        if not os.path.exists(self.video_folder):
-            os.makedirs(self.video_folder)
+        os.makedirs(self.video_folder, exist_ok=True)
     
     def get_indexed_files(self) -> set:
         """Returns set of already indexed video files"""
-        frames = self.repository.load_all()
-        segments = self.repository.load_all_segments()
-        frame_files = {frame.video_filename for frame in frames}
-        segment_files = {segment.video_filename for segment in segments}
-        return frame_files | segment_files
-    
-    def index_new_videos(self) -> int:
-        """Indexes new videos from folder"""
-        removed = self.repository.prune_missing()
-        if removed > 0:
-            print(_("video_indexing_pruned", count=removed))
+        return self.repository.list_indexed_filenames()
+    
+    def _state_signature(self) -> Optional[str]:
+        """Combines video folder and DB mtimes; None if the folder can't be stat'ed"""
+        try:
+            folder_mtime = os.stat(self.video_folder).st_mtime_ns
+        except OSError:
+            return None
+        return f"{folder_mtime}:{self.repository.last_modified_ns()}"
+    
+    def _read_state(self) -> Optional[str]:
+        """Reads signature saved after the last indexing run"""
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    def _write_state(self) -> None:
+        """Saves current signature so unchanged folders are skipped next time"""
+        signature = self._state_signature()
+        if signature is None:
+            return
+        try:
+            state_dir = os.path.dirname(self.state_file)
+            if state_dir:
+                os.makedirs(state_dir, exist_ok=True)
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                f.write(signature)
+        except OSError:
+            pass
+    
+    def index_new_videos(self, force: bool = False) -> int:
+        """Indexes new videos from folder; skips the scan if nothing changed since last run"""
+        if not force:
+            signature = self._state_signature()
+            if signature is not None and signature == self._read_state():
+                self._info(_("video_indexing_index_actual"))
+                return 0
         
-        processed_files = self.get_indexed_files()
+        if self.logger:
+            self.logger.debug(f"Scanning video folder: {self.video_folder}")
+        removed, processed_files = self.repository.prune_missing_and_list()
+        if removed > 0:
+            self._info(_("video_indexing_pruned", count=removed))
         
         try:
-            files_on_disk = [
-                f for f in os.listdir(self.video_folder) 
-                if f.endswith(('.mp4', '.mov', '.mkv'))
+            new_files = [
+                name for name in _scan_videos(self.video_folder)
+                if name not in processed_files
             ]
-        except OSError as e:
-             files_on_disk = []
-
-        new_files = [f for f in files_on_disk if f not in processed_files]
+        except OSError:
+            new_files = []
         
         if not new_files:
-            print(_("video_indexing_index_actual"))
+            self._write_state()
+            self._info(_("video_indexing_index_actual"))
             return 0
         
-        print(_("video_indexing_new_videos_found", count=len(new_files)))
-        success_count = 0
+        self._info(_("video_indexing_new_videos_found", count=len(new_files)))
         
+        workers = min(len(new_files), self.workers)
+        self._failed_files = set()
+        self._write_queue = queue.Queue(maxsize=_WRITE_QUEUE_SIZE)
+        writer = threading.Thread(target=self._writer_loop, args=(self._write_queue,), daemon=True)
+        writer.start()
+        try:
+            if workers <= 1:
+                success_count = self._index_serial(new_files)
+            else:
+                success_count = self._index_parallel(new_files, workers)
+        finally:
+            self._write_queue.put(None)
+            writer.join()
+            self._write_queue = None
+            self.indexer.close()
+        
+        success_count -= len(self._failed_files)
+        if not self._failed_files and success_count == len(new_files):
+            self._write_state()
+        return success_count
+    
+    def _index_serial(self, new_files: List[str]) -> int:
+        """Indexes videos one by one in current process"""
+        success_count = 0
+        folder_prefix = os.path.join(self.video_folder, "")
         for filename in new_files:
-            full_path = os.path.join(self.video_folder, filename)
             try:
-                segments = self.indexer.extract_segments(full_path)
-                if segments:
-                    self.repository.save_segments(segments)
-                    print(_("video_indexing_added_to_db", filename=filename))
+                kind, items = _index_one(self.indexer, folder_prefix + filename, self.target_fps, stream_frames=True)
+                if self._store(filename, kind, items):
                     success_count += 1
-                else:
-                    frames = self.indexer.extract_frames(full_path)
-                    if frames:
-                        self.repository.save(frames)
-                        print(_("video_indexing_added_to_db", filename=filename))
-                        success_count += 1
             except Exception as e:
-                print(_("video_indexing_error_with_file", filename=filename, error=e))
-                import traceback
-                traceback.print_exc()
-        
-        return success_count
\ No newline at end of file
+                self._report_error(filename, e)
+        return success_count
+    
+    def _report_error(self, filename: str, error: Exception) -> None:
+        """Reports indexing failure with traceback"""
+        if self.logger:
+            self.logger.exception(_("video_indexing_error_with_file", filename=filename, error=error))
+        else:
+            print(_("video_indexing_error_with_file", filename=filename, error=error))
+            traceback.print_exc()
+    
+    def _index_parallel(self, new_files: List[str], workers: int) -> int:
+        """Indexes videos in worker threads or processes; results are saved by the writer thread"""
+        success_count = 0
+        pool_cls = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        folder_prefix = os.path.join(self.video_folder, "")
+        with pool_cls(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_index_one, self.indexer, folder_prefix + filename, self.target_fps): filename
+                for filename in new_files
+            }
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    kind, items = future.result()
+                    if self._store(filename, kind, items):
+                        success_count += 1
+                except Exception as e:
+                    self._report_error(filename, e)
+        return success_count
+    
+    def _store(self, filename: str, kind: Optional[str], items: Iterable) -> bool:
+        """Hands extracted segments or frames to the writer thread"""
+        if kind not in ("segments", "frames"):
+            return False
+        self._write_queue.put((filename, kind, items))
+        return True
+    
+    def _writer_loop(self, tasks: queue.Queue) -> None:
+        """Consumes save tasks: frames are written per video, segments are flushed every checkpoint_every videos"""
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            filename, kind, items = task
+            if kind == "frames":
+                self._save_frames(filename, items)
+                continue
+            self._pending_segments.extend(items)
+            self._pending_files.append(filename)
+            if len(self._pending_files) >= self.checkpoint_every:
+                self._safe_flush()
+        self._safe_flush()
+    
+    def _safe_flush(self) -> None:
+        """Flushes pending items, reporting errors instead of killing the writer"""
+        try:
+            self._flush_pending()
+        except Exception as e:
+            if self.logger:
+                self.logger.exception(_("video_indexing_error_with_file", filename=", ".join(self._pending_files), error=e))
+            else:
+                print(_("video_indexing_error_with_file", filename=", ".join(self._pending_files), error=e))
+            self._failed_files.update(self._pending_files)
+            self._pending_segments = []
+            self._pending_files = []
+    
+    def _save_frames(self, filename: str, frames: Iterable[VisualFrame]) -> None:
+        """Streams one video's frames to repository, reporting errors instead of killing the writer"""
+        try:
+            self.repository.save(frames)
+        except Exception as e:
+            self._report_error(filename, e)
+            self._failed_files.add(filename)
+            return
+        self._info(get_template("video_indexing_added_to_db").format(filename=filename))
+    
+    def _flush_pending(self) -> None:
+        """Writes queued segments to repository in one call"""
+        if self._pending_segments:
+            self.repository.save_segments(self._pending_segments)
+        tpl_added = get_template("video_indexing_added_to_db")
+        for filename in self._pending_files:
+            self._info(tpl_added.format(filename=filename))
+        self._pending_segments = []
+        self._pending_files = []
@@ -1,6 +1,7 @@
 """Application configuration"""
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -11,9 +12,22 @@ class AppConfig:
     use_windows_credential_manager: bool = True
     video_folder: str = "source_videos"
     frames_dir: str = "data/frames"
+    scene_cache_dir: str = "data/scene_cache"
     db_file: str = "data/visual_db.json"
     cache_file: str = "data/visual_db.npy"
     feedback_file: str = "data/feedback.json"
+    index_workers: int = 0
+    index_checkpoint_every: int = 20
+    debug_logging: bool = False
+    index_state_file: str = "data/.last_index_mtime"
+    index_target_fps: Optional[float] = None
+    """Opt-in: samples scene detection at this rate via frame_skip; faster, but cuts between sampled frames are detected less accurately"""
+    index_executor: str = "thread"
+    detect_downscale: int = 0
+    detect_frame_skip: int = 0
+    index_scene_workers: int = 0
+    index_single_pass: bool = False
+    export_text_encoders: bool = False
     
     @classmethod
     def from_env(cls) -> "AppConfig":
@@ -24,9 +38,21 @@ class AppConfig:
             use_windows_credential_manager=os.getenv("USE_WIN_CRED", "true").lower() == "true",
             video_folder=os.getenv("VIDEO_FOLDER", "source_videos"),
             frames_dir=os.getenv("FRAMES_DIR", "data/frames"),
+            scene_cache_dir=os.getenv("SCENE_CACHE_DIR", "data/scene_cache"),
             db_file=os.getenv("DB_FILE", "data/visual_db.json"),
             cache_file=os.getenv("CACHE_FILE", "data/visual_db.npy"),
             feedback_file=os.getenv("FEEDBACK_FILE", "data/feedback.json"),
+            index_workers=int(os.getenv("INDEX_WORKERS", "0")),
+            index_checkpoint_every=int(os.getenv("INDEX_CHECKPOINT_EVERY", "20")),
+            debug_logging=os.getenv("DEBUG_LOGGING", "false").lower() == "true",
+            index_state_file=os.getenv("INDEX_STATE_FILE", "data/.last_index_mtime"),
+            index_target_fps=float(os.getenv("INDEX_TARGET_FPS", "0")) or None,
+            index_executor=os.getenv("INDEX_EXECUTOR", "thread"),
+            detect_downscale=int(os.getenv("DETECT_DOWNSCALE", "0")),
+            detect_frame_skip=int(os.getenv("DETECT_FRAME_SKIP", "0")),
+            index_scene_workers=int(os.getenv("INDEX_SCENE_WORKERS", "0")),
+            index_single_pass=os.getenv("INDEX_SINGLE_PASS", "false").lower() == "true",
+            export_text_encoders=os.getenv("EXPORT_TEXT_ENCODERS", "false").lower() == "true",
         )
 
 
@@ -2,6 +2,11 @@ from abc import ABC, abstractmethod
 
 class ILogger(ABC):
     """Logging interface"""
+    @abstractmethod
+    def debug(self, message: str) -> None:
+        """Diagnostic message, may be filtered out"""
+        pass
+    
     @abstractmethod
     def info(self, message: str) -> None:
         """Information message"""
@@ -15,4 +20,9 @@ class ILogger(ABC):
     @abstractmethod
     def warning(self, message: str) -> None:
         """Warning message"""
+        pass
+    
+    @abstractmethod
+    def exception(self, message: str) -> None:
+        """Error message with traceback of the exception being handled"""
         pass
\ No newline at end of file
@@ -1,20 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
 from ...visual_frame import VisualFrame
 from ...video_segment import VideoSegment
 
 class ISearchEngine(ABC):
     """Search engine interface"""
     @abstractmethod
-    def search(self, query_text: str, limit: int = 5) -> List[tuple[VisualFrame, float]]:
+    def search(self, query_text: str, limit: int = 5) -> list[tuple[VisualFrame, float]]:
         """Ищет кадры по текстовому запросу (старый метод для обратной совместимости)"""
         pass
     
-    def search_segments(self, query_text: str, limit: int = 5) -> List[tuple[VideoSegment, float]]:
+    def search_segments(self, query_text: str, limit: int = 5) -> list[tuple[VideoSegment, float]]:
         """Ищет сегменты по текстовому запросу (новый метод)"""
         frame_results = self.search(query_text, limit)
         return []
     
+    def batch_search(self, query_texts: list[str], limit: int = 5) -> list[list[tuple[VisualFrame, float]]]:
+        """Ищет кадры для нескольких запросов (по умолчанию последовательно)"""
+        return [self.search(query_text, limit) for query_text in query_texts]
+    
+    def batch_search_segments(self, query_texts: list[str], limit: int = 5) -> list[list[tuple[VideoSegment, float]]]:
+        """Ищет сегменты для нескольких запросов (по умолчанию последовательно)"""
+        return [self.search_segments(query_text, limit) for query_text in query_texts]
+    
     @abstractmethod
     def record_feedback(self, frame: VisualFrame, is_positive: bool) -> None:
         """Сохраняет обратную связь для улучшения поиска"""
@@ -31,6 +38,6 @@ class ISearchEngine(ABC):
         pass
     
     @abstractmethod
-    def extract_tags(self, text: str) -> List[str]:
+    def extract_tags(self, text: str) -> list[str]:
         """Извлекает ключевые слова/теги из текста"""
         pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, Optional
 from ...visual_frame import VisualFrame
 from ...video_segment import VideoSegment
 
@@ -7,11 +7,11 @@ from ...video_segment import VideoSegment
 class IFrameRepository(ABC):
     """Frame and segment repository interface"""
     @abstractmethod
-    def save(self, frames: List[VisualFrame]) -> None:
+    def save(self, frames: Iterable[VisualFrame]) -> None:
         """Сохраняет список кадров (старый метод для обратной совместимости)"""
         pass
     
-    def save_segments(self, segments: List[VideoSegment]) -> None:
+    def save_segments(self, segments: list[VideoSegment]) -> None:
         """Сохраняет список сегментов (новый метод)"""
         all_frames = []
         for segment in segments:
@@ -20,16 +20,30 @@ class IFrameRepository(ABC):
             self.save(all_frames)
     
     @abstractmethod
-    def load_all(self) -> List[VisualFrame]:
+    def load_all(self) -> list[VisualFrame]:
         """Загружает все кадры (старый метод для обратной совместимости)"""
         pass
     
-    def load_all_segments(self) -> List[VideoSegment]:
+    def load_all_segments(self) -> list[VideoSegment]:
         """Загружает все сегменты (новый метод)"""
         return []
     
+    def list_indexed_filenames(self) -> set[str]:
+        """Возвращает имена проиндексированных видеофайлов"""
+        filenames = {frame.video_filename for frame in self.load_all()}
+        filenames.update(segment.video_filename for segment in self.load_all_segments())
+        return filenames
+    
     @abstractmethod
     def prune_missing(self) -> int:
         """Удаляет записи о несуществующих файлах"""
         pass
-
+    
+    def last_modified_ns(self) -> Optional[int]:
+        """Возвращает время последнего изменения хранилища (None, если неизвестно)"""
+        return None
+    
+    def prune_missing_and_list(self) -> tuple[int, set[str]]:
+        """Удаляет записи о несуществующих файлах и возвращает имена проиндексированных видео"""
+        removed = self.prune_missing()
+        return removed, self.list_indexed_filenames()
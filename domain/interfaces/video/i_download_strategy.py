@@ -3,6 +3,8 @@ from typing import Optional
 
 class IDownloadStrategy(ABC):
     """Video download strategy interface"""
+    netlocs: tuple[str, ...] = ()
+    
     @abstractmethod
     def can_handle(self, url: str) -> bool:
         """Checks if strategy can handle URL"""
@@ -1,14 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Callable
+from typing import Optional, Callable
 
 class IVideoDownloader(ABC):
     """Dependency Inversion: Абстракция для загрузчика видео"""
     @abstractmethod
     def download_list(
         self, 
-        urls: List[str], 
+        urls: list[str], 
         output_dir: str, 
         progress_callback: Optional[Callable[[str, dict], None]] = None
-    ) -> List[dict]:
+    ) -> list[dict]:
         """Загружает список URL и возвращает результаты"""
         pass
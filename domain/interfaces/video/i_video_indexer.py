@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, Optional
 from ...visual_frame import VisualFrame
 from ...video_segment import VideoSegment
 
@@ -7,12 +7,23 @@ from ...video_segment import VideoSegment
 class IVideoIndexer(ABC):
     """Video indexing interface"""
     @abstractmethod
-    def extract_frames(self, video_path: str, threshold: float = 27.0) -> List[VisualFrame]:
-        """Извлекает ключевые кадры из видео (старый метод для обратной совместимости)"""
+    def extract_frames(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> list[VisualFrame]:
+        """Извлекает ключевые кадры из видео (старый метод для обратной совместимости).
+        target_fps: частота анализа кадров; реализация может пропускать/перематывать кадры вместо полного декодирования"""
         pass
     
-    def extract_segments(self, video_path: str, threshold: float = 27.0) -> List[VideoSegment]:
+    def iter_frames(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> Iterator[VisualFrame]:
+        """Отдаёт ключевые кадры по одному, не держа весь список в памяти"""
+        yield from self.extract_frames(video_path, threshold, target_fps)
+    
+    def extract_segments(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> list[VideoSegment]:
         """Извлекает сегменты из видео (новый метод)"""
-        frames = self.extract_frames(video_path, threshold)
         return []
-
+    
+    def iter_segments(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> Iterator[VideoSegment]:
+        """Отдаёт сегменты по одному по мере готовности"""
+        yield from self.extract_segments(video_path, threshold, target_fps)
+    
+    def close(self) -> None:
+        """Освобождает фоновые ресурсы после индексации"""
+        pass
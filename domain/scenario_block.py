@@ -1,5 +1,6 @@
+from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ScenarioBlock:
     """Entity: Блок текста из сценария"""
     text: str
@@ -1,5 +1,14 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 
-@dataclass
+
+@lru_cache(maxsize=4096)
+def _fmt_tc(seconds: int) -> str:
+    """Форматирует целые секунды как MM:SS"""
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """Entity: Результат поиска кадра/сегмента по тексту сценария"""
     scenario_text_snippet: str
@@ -8,7 +17,7 @@ class SearchResult:
     timestamp_seconds: float
     accuracy_score: float
     frame_path: str
-    tags: List[str]
+    tags: list[str]
     start_time: Optional[float] = None
     end_time: Optional[float] = None
     segment_id: Optional[str] = None
@@ -33,12 +42,4 @@ class SearchResult:
         """Возвращает строку с временным диапазоном для сегмента"""
         if not self.is_segment():
             return self.timecode_str
-        
-        def format_timecode(seconds: float) -> str:
-            m = int(seconds // 60)
-            s = int(seconds % 60)
-            return f"{m:02d}:{s:02d}"
-        
-        start_tc = format_timecode(self.start_time)
-        end_tc = format_timecode(self.end_time)
-        return f"{start_tc} - {end_tc}"
\ No newline at end of file
+        return f"{_fmt_tc(int(self.start_time))} - {_fmt_tc(int(self.end_time))}"
\ No newline at end of file
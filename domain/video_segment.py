@@ -1,5 +1,7 @@
+from dataclasses import dataclass
+from .visual_frame import VisualFrame
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VideoSegment:
     """Entity: Представляет сегмент (фрагмент) видео"""
     video_filename: str
@@ -7,20 +9,46 @@ class VideoSegment:
     end_time: float
     segment_id: str
     preview_frame_path: str
-    key_frames: List[VisualFrame] = field(default_factory=list)
+    key_frames: tuple[VisualFrame, ...] = ()
     
     def __post_init__(self):
         """Валидация данных"""
-        if self.start_time < 0:
-            raise ValueError("Start time не может быть отрицательным")
-        if self.end_time <= self.start_time:
-            raise ValueError("End time должен быть больше start time")
-        if not self.video_filename:
-            raise ValueError("Имя файла не может быть пустым")
-        if not self.segment_id:
-            raise ValueError("Segment ID не может быть пустым")
-        if not self.preview_frame_path:
-            raise ValueError("Preview frame path не может быть пустым")
+        if (
+            self.start_time < 0
+            or self.end_time <= self.start_time
+            or not self.video_filename
+            or not self.segment_id
+            or not self.preview_frame_path
+        ):
+            for failed, message in (
+                (self.start_time < 0, "Start time не может быть отрицательным"),
+                (self.end_time <= self.start_time, "End time должен быть больше start time"),
+                (not self.video_filename, "Имя файла не может быть пустым"),
+                (not self.segment_id, "Segment ID не может быть пустым"),
+                (not self.preview_frame_path, "Preview frame path не может быть пустым"),
+            ):
+                if failed:
+                    raise ValueError(message)
+    
+    @classmethod
+    def _unchecked(
+        cls,
+        video_filename: str,
+        start_time: float,
+        end_time: float,
+        segment_id: str,
+        preview_frame_path: str,
+        key_frames: tuple[VisualFrame, ...] = ()
+    ) -> "VideoSegment":
+        """Создает сегмент из доверенных данных без валидации"""
+        segment = object.__new__(cls)
+        object.__setattr__(segment, "video_filename", video_filename)
+        object.__setattr__(segment, "start_time", start_time)
+        object.__setattr__(segment, "end_time", end_time)
+        object.__setattr__(segment, "segment_id", segment_id)
+        object.__setattr__(segment, "preview_frame_path", preview_frame_path)
+        object.__setattr__(segment, "key_frames", key_frames)
+        return segment
     
     def duration(self) -> float:
         """Возвращает длительность сегмента в секундах"""
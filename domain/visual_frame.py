@@ -1,4 +1,6 @@
-@dataclass
+from dataclasses import dataclass
+
+@dataclass(slots=True, frozen=True)
 class VisualFrame:
     """Entity: Represents a single frame from a video"""
     video_filename: str
@@ -1,43 +1,138 @@
 
 import os
+import sys
 import json
 import threading
+import queue
+import time
 import re
 import numpy as np
 import torch
-from typing import List, Tuple, Optional
-from sentence_transformers import SentenceTransformer, util
+import torch.nn.functional as F
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple, Optional, Union
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+from sentence_transformers import SentenceTransformer
 from domain import ISearchEngine, IFrameRepository, VisualFrame, VideoSegment
+from .onnx_clip import OnnxTextEncoder
+from .torchscript_clip import TorchScriptTextEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Hits = Tuple[np.ndarray, np.ndarray]
+
+_QUERY_CACHE_SIZE = 256
+_TAGS_CACHE_SIZE = 1024
+_BATCH_MAX_REQUESTS = 16
+_BATCH_WAIT_S = 0.005
+_CPU_BLOCK_ROWS = 16384
+_TOKEN_RE = re.compile(r"[A-Za-zА-Яа-яёЁ0-9]+")
+_STOP_WORDS = frozenset({
+    "и", "в", "на", "с", "по", "к", "о", "за", "для", "как", "что", "это", "из", "или", "но",
+    "the", "and", "for", "with", "about", "from", "into", "over", "under", "been", "were",
+    "was", "are", "you", "your", "our", "мы", "они", "она", "он", "его", "ее", "их", "там",
+    "then", "than", "that", "this", "those", "these", "потом", "тогда", "еще", "ещё",
+})
+
+
+def _json_dumps(data) -> bytes:
+    """Serializes to JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    """Parses JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _scan_existing(paths: Iterable[str]) -> Dict[str, os.DirEntry]:
+    """Maps existing file paths to their DirEntry, scanning each parent directory once"""
+    by_dir = defaultdict(list)
+    for path in paths:
+        by_dir[os.path.dirname(path)].append(path)
+    
+    existing = {}
+    for directory, dir_paths in by_dir.items():
+        try:
+            with os.scandir(directory or ".") as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            continue
+        for path in dir_paths:
+            entry = entries.get(os.path.basename(path))
+            if entry is not None:
+                existing[path] = entry
+    return existing
+
+
+class _ImageDataset(Dataset):
+    """Decodes frame images in DataLoader workers"""
+    
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def __getitem__(self, idx: int) -> Image.Image:
+        with Image.open(self.paths[idx]) as image:
+            return image.convert("RGB")
 
 
 class ClipSearchEngine(ISearchEngine):
     """CLIP-based frame search engine"""
     
+    _MODEL_CACHE: dict[str, SentenceTransformer] = {}
+    _MODEL_CACHE_LOCK = threading.Lock()
+    
     def __init__(
         self, 
         repository: IFrameRepository,
         model_name: str = 'clip-ViT-B-32-multilingual-v1',
         cache_file: str = "data/visual_db.npy",
-        feedback_file: str = "data/feedback.json"
+        feedback_file: str = "data/feedback.json",
+        onnx_text_file: Optional[str] = "data/clip_text.onnx",
+        frozen_text_file: Optional[str] = "data/clip_text_frozen.pt",
+        export_text_encoders: bool = False
     ):
         self.repository = repository
         self.model_name = model_name
         self.cache_file = cache_file
         self.feedback_file = feedback_file
+        self.feedback_log_file = os.path.splitext(feedback_file)[0] + ".jsonl"
+        self._feedback_log_entries = 0
+        self._frame_feedback_mult = np.ones(0, dtype=np.float32)
+        self._segment_feedback_mult = np.ones(0, dtype=np.float32)
+        self._frame_key_index: dict[str, List[int]] = {}
+        self._segment_key_index: dict[str, List[int]] = {}
+        self.onnx_text_file = onnx_text_file
+        self.frozen_text_file = frozen_text_file
+        self.export_text_encoders = export_text_encoders
         self.model: Optional[SentenceTransformer] = None
+        self.text_encoder: Optional[Union[OnnxTextEncoder, TorchScriptTextEncoder]] = None
         self.frames: List[VisualFrame] = []
         self.segments: List[VideoSegment] = []
         self.embeddings: Optional[torch.Tensor] = None
         self.segment_embeddings: Optional[torch.Tensor] = None
+        self.dtype = torch.float16
         self.feedback_lock = threading.Lock()
         self.feedback = {"positive": set(), "negative": set()}
         self._weights = {"text": 0.7, "tags": 0.3}
-        self._stop_words = {
-            "и", "в", "на", "с", "по", "к", "о", "за", "для", "как", "что", "это", "из", "или", "но",
-            "the", "and", "for", "with", "about", "from", "into", "over", "under", "been", "were",
-            "was", "are", "you", "your", "our", "мы", "они", "она", "он", "его", "ее", "их", "там",
-            "then", "than", "that", "this", "those", "these", "потом", "тогда", "еще", "ещё",
-        }
+        self._stop_words = _STOP_WORDS
+        self._cache_lock = threading.Lock()
+        self._query_cache: OrderedDict[str, torch.Tensor] = OrderedDict()
+        self._tags_cache: OrderedDict[str, str] = OrderedDict()
+        self._batch_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._batch_thread: Optional[threading.Thread] = None
         self._initialized = False
     
     def _initialize(self) -> None:
@@ -46,14 +141,50 @@ class ClipSearchEngine(ISearchEngine):
             return
         
         print("🧠 Loading Multilingual CLIP model...")
-        self.model = SentenceTransformer(self.model_name)
-        self.frames = self.repository.load_all()
-        self.segments = self.repository.load_all_segments()
-        self._load_feedback()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            model_future = executor.submit(self._load_model, self.model_name)
+            frames_future = executor.submit(self.repository.load_all)
+            segments_future = executor.submit(self.repository.load_all_segments)
+            feedback_future = executor.submit(self._load_feedback)
+            self.frames = frames_future.result()
+            self.segments = segments_future.result()
+            feedback_future.result()
+            self.model = model_future.result()
+        
+        with self._cache_lock:
+            self._query_cache.clear()
+        if self.onnx_text_file:
+            self.text_encoder = OnnxTextEncoder.load_or_export(
+                self.model,
+                self.onnx_text_file,
+                self.model_name,
+                allow_export=self.export_text_encoders
+            )
+        if self.text_encoder is None and self.frozen_text_file:
+            self.text_encoder = TorchScriptTextEncoder.load_or_trace(
+                self.model,
+                self.frozen_text_file,
+                self.model_name,
+                allow_export=self.export_text_encoders
+            )
         self._load_or_index_images()
         self._load_or_index_segments()
+        self._rebuild_feedback_multipliers()
+        if self._batch_thread is None:
+            self._batch_thread = threading.Thread(target=self._batch_worker, daemon=True)
+            self._batch_thread.start()
         self._initialized = True
     
+    @classmethod
+    def _load_model(cls, model_name: str) -> SentenceTransformer:
+        """Returns shared model instance, loading weights once per process"""
+        with cls._MODEL_CACHE_LOCK:
+            model = cls._MODEL_CACHE.get(model_name)
+            if model is None:
+                model = SentenceTransformer(model_name)
+                cls._MODEL_CACHE[model_name] = model
+            return model
+    
     def is_ready(self) -> bool:
         """Checks if search engine is ready"""
         if not self._initialized:
@@ -65,58 +196,182 @@ class ClipSearchEngine(ISearchEngine):
     
     def search(self, query_text: str, limit: int = 5) -> List[Tuple[VisualFrame, float]]:
         """Searches frames by text query"""
+        return self.batch_search([query_text], limit)[0]
+    
+    def batch_search(self, query_texts: List[str], limit: int = 5) -> List[List[Tuple[VisualFrame, float]]]:
+        """Searches frames for several text queries with one encoder pass per query kind"""
         if not self.is_ready():
+            return [[] for _ in query_texts]
+        
+        queries = [query_text.strip() for query_text in query_texts]
+        tag_queries = [self._extract_tags_internal(query_text) for query_text in queries]
+        
+        text_hits, tag_hits = self._batch_semantic_search(
+            [queries, tag_queries],
+            self.embeddings,
+            [max(limit * 3, 15), max(limit * 2, 10)]
+        )
+        
+        frames = self.frames
+        return [
+            [
+                (frames[idx], score)
+                for idx, score in self._rank_hits(query_text_hits, query_tag_hits, self._frame_feedback_mult, limit)
+            ]
+            for query_text_hits, query_tag_hits in zip(text_hits, tag_hits)
+        ]
+    
+    def _batch_semantic_search(
+        self,
+        text_groups: List[List[str]],
+        corpus_embeddings: torch.Tensor,
+        top_ks: List[int]
+    ) -> List[List[Optional[Hits]]]:
+        """Encodes non-empty texts of all groups in one forward pass; returns per-group hits aligned with texts (None for empty)"""
+        positions = [
+            (group_idx, i)
+            for group_idx, texts in enumerate(text_groups)
+            for i, text in enumerate(texts) if text
+        ]
+        hits_per_group: List[List[Optional[Hits]]] = [[None] * len(texts) for texts in text_groups]
+        if not positions:
+            return hits_per_group
+        
+        query_embs = self._encode_texts([text_groups[g][i] for g, i in positions])
+        
+        offset = 0
+        for group_idx, top_k in enumerate(top_ks):
+            group_positions = [i for g, i in positions if g == group_idx]
+            if group_positions:
+                group_embs = query_embs[offset:offset + len(group_positions)]
+                hits = self._top_k_hits(group_embs, corpus_embeddings, top_k)
+                for position, query_hits in zip(group_positions, hits):
+                    hits_per_group[group_idx][position] = query_hits
+            offset += len(group_positions)
+        return hits_per_group
+    
+    @staticmethod
+    def _normalize(embeddings: torch.Tensor) -> torch.Tensor:
+        """L2-normalizes embeddings row-wise so cosine similarity is a plain dot product"""
+        return F.normalize(embeddings.float(), dim=-1).contiguous()
+    
+    def _prepare_corpus(self, embeddings: torch.Tensor) -> torch.Tensor:
+        """Normalizes corpus embeddings and moves them to the model device in storage dtype"""
+        return self._normalize(embeddings).to(device=self.model.device, dtype=self.dtype)
+    
+    def _save_embeddings(self, cache_file: str, embeddings: torch.Tensor) -> None:
+        """Saves corpus embeddings in storage dtype (FP16 halves cache size)"""
+        np.save(cache_file, embeddings.to(self.dtype).cpu().numpy())
+    
+    def _load_embeddings(self, cache_file: str, expected_len: int) -> Optional[torch.Tensor]:
+        """Memory-maps FP16 caches on CPU (copies them to the model device otherwise); upgrades FP32 caches in place"""
+        cached_emb = np.load(cache_file, mmap_mode="c")
+        if len(cached_emb) != expected_len:
+            del cached_emb
+            os.remove(cache_file)
+            return None
+        if cached_emb.dtype == torch.empty(0, dtype=self.dtype).numpy().dtype:
+            return torch.from_numpy(cached_emb).to(self.model.device)
+        embeddings = self._prepare_corpus(torch.from_numpy(np.asarray(cached_emb)))
+        del cached_emb
+        self._save_embeddings(cache_file, embeddings)
+        return embeddings
+    
+    @staticmethod
+    @torch.inference_mode()
+    def _top_k_hits(query_embs: torch.Tensor, corpus_embeddings: torch.Tensor, top_k: int) -> List[Hits]:
+        """Ranks pre-normalized corpus against queries; on CPU upcasts FP16 rows block by block with a running topk merge"""
+        if corpus_embeddings.is_cuda:
+            compute_dtype = corpus_embeddings.dtype
+            block_rows = max(len(corpus_embeddings), 1)
+        else:
+            compute_dtype = torch.float32
+            block_rows = _CPU_BLOCK_ROWS
+        queries = ClipSearchEngine._normalize(query_embs).to(
+            device=corpus_embeddings.device,
+            dtype=compute_dtype
+        )
+        k = min(top_k, len(corpus_embeddings))
+        values = indices = None
+        for start in range(0, max(len(corpus_embeddings), 1), block_rows):
+            block = corpus_embeddings[start:start + block_rows].to(compute_dtype)
+            block_values, block_indices = torch.topk(queries @ block.T, min(k, len(block)), dim=1)
+            block_indices += start
+            if values is None:
+                values, indices = block_values, block_indices
+                continue
+            values, order = torch.topk(torch.cat([values, block_values], dim=1), k, dim=1)
+            indices = torch.gather(torch.cat([indices, block_indices], dim=1), 1, order)
+        values = values.float().cpu().numpy()
+        indices = indices.cpu().numpy()
+        return list(zip(indices, values))
+    
+    def _rank_hits(
+        self,
+        text_hits: Optional[Hits],
+        tag_hits: Optional[Hits],
+        feedback_mult: np.ndarray,
+        limit: int
+    ) -> List[Tuple[int, float]]:
+        """Combines text/tag scores over candidate ids, applies feedback and returns top (id, score)"""
+        id_parts = [hits[0] for hits in (text_hits, tag_hits) if hits is not None]
+        if not id_parts:
             return []
-        
-        aggregated_hits = {}
-        query_text = query_text.strip()
-        
-        tag_query = self._extract_tags_internal(query_text)
-        
-        
-        if query_text:
-            text_emb = self.model.encode(query_text, convert_to_tensor=True)
-            text_hits = util.semantic_search(
-                text_emb, self.embeddings, top_k=max(limit * 3, 15)
-            )
-            self._merge_hits(text_hits, "text", aggregated_hits)
-        
-        
-        if tag_query:
-            tag_emb = self.model.encode(tag_query, convert_to_tensor=True)
-            tag_hits = util.semantic_search(
-                tag_emb, self.embeddings, top_k=max(limit * 2, 10)
-            )
-            self._merge_hits(tag_hits, "tags", aggregated_hits)
-        
-        
-        results = []
-        for data in aggregated_hits.values():
-            scores = data["scores"]
-            combined = sum(
-                self._weights.get(source, 0.0) * score 
-                for source, score in scores.items()
-            )
-            if "text" not in scores:
-                combined *= 0.8  
-            results.append((data["frame"], combined))
-        
-        adjusted = []
-        for frame, score in results:
-            key = self._feedback_key(frame)
-            if key in self.feedback["negative"]:
-                score *= 0.2
-            elif key in self.feedback["positive"]:
-                score *= 1.25
-
-
-            final_score = max(0.0, min(score, 1.0))
-
-
-            adjusted.append((frame, final_score))
-        
-        adjusted.sort(key=lambda item: item[1], reverse=True)
-        return adjusted[:limit]
+        ids = np.unique(np.concatenate(id_parts))
+        combined = np.zeros(len(ids), dtype=np.float32)
+        has_text = np.zeros(len(ids), dtype=bool)
+        
+        if text_hits is not None:
+            pos = np.searchsorted(ids, text_hits[0])
+            combined[pos] += self._weights["text"] * text_hits[1]
+            has_text[pos] = True
+        if tag_hits is not None:
+            pos = np.searchsorted(ids, tag_hits[0])
+            combined[pos] += self._weights["tags"] * tag_hits[1]
+        combined[~has_text] *= 0.8
+        
+        if len(feedback_mult):
+            combined *= feedback_mult[ids]
+        np.clip(combined, 0.0, 1.0, out=combined)
+        
+        if len(ids) > limit:
+            top = np.argpartition(-combined, limit)[:limit]
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-combined[top], kind="stable")]
+        return [(int(ids[i]), float(combined[i])) for i in top]
+    
+    def _rebuild_feedback_multipliers(self) -> None:
+        """Precomputes key->index maps and per-item feedback multipliers for frames and segments"""
+        self._frame_key_index = self._build_key_index([self._feedback_key(frame) for frame in self.frames])
+        self._segment_key_index = self._build_key_index([
+            self._feedback_key(segment.key_frames[0]) if segment.key_frames else None
+            for segment in self.segments
+        ])
+        self._frame_feedback_mult = np.ones(len(self.frames), dtype=np.float32)
+        self._segment_feedback_mult = np.ones(len(self.segments), dtype=np.float32)
+        for key in self.feedback["positive"]:
+            self._update_feedback_multipliers(key, 1.25)
+        for key in self.feedback["negative"]:
+            self._update_feedback_multipliers(key, 0.2)
+    
+    @staticmethod
+    def _build_key_index(keys: List[Optional[str]]) -> dict[str, List[int]]:
+        """Maps feedback key to indices of items sharing it"""
+        index: dict[str, List[int]] = {}
+        for idx, key in enumerate(keys):
+            if key is not None:
+                index.setdefault(key, []).append(idx)
+        return index
+    
+    def _update_feedback_multipliers(self, key: str, multiplier: float) -> None:
+        """Sets feedback multiplier for all frames and segments with key"""
+        frame_ids = self._frame_key_index.get(key)
+        if frame_ids:
+            self._frame_feedback_mult[frame_ids] = multiplier
+        segment_ids = self._segment_key_index.get(key)
+        if segment_ids:
+            self._segment_feedback_mult[segment_ids] = multiplier
     
     def record_feedback(self, frame: VisualFrame, is_positive: bool) -> None:
         """Saves feedback"""
@@ -125,13 +380,11 @@ class ClipSearchEngine(ISearchEngine):
         
         key = self._feedback_key(frame)
         with self.feedback_lock:
-            if is_positive:
-                self.feedback["negative"].discard(key)
-                self.feedback["positive"].add(key)
-            else:
-                self.feedback["positive"].discard(key)
-                self.feedback["negative"].add(key)
-            self._persist_feedback()
+            self._apply_feedback(key, is_positive)
+            self._append_feedback_log(key, is_positive)
+            if self._feedback_log_entries > 2 * (len(self.feedback["positive"]) + len(self.feedback["negative"])):
+                self._compact_feedback()
+            self._update_feedback_multipliers(key, 1.25 if is_positive else 0.2)
     
     def extract_tags(self, text: str) -> List[str]:
         """Extracts keywords from text (public interface method)"""
@@ -139,74 +392,206 @@ class ClipSearchEngine(ISearchEngine):
         return [tag.strip() for tag in tags_str.split(',') if tag.strip()]
     
     def _extract_tags_internal(self, text: str) -> str:
-        """Extracts keywords from text"""
-        tokens = re.findall(r"[A-Za-zА-Яа-яёЁ0-9]+", text.lower())
+        """Extracts keywords from text (memoized)"""
+        with self._cache_lock:
+            tags = self._tags_cache.get(text)
+            if tags is not None:
+                self._tags_cache.move_to_end(text)
+                return tags
+        
+        tags = self._compute_tags(text)
+        with self._cache_lock:
+            self._tags_cache[text] = tags
+            if len(self._tags_cache) > _TAGS_CACHE_SIZE:
+                self._tags_cache.popitem(last=False)
+        return tags
+    
+    def _compute_tags(self, text: str) -> str:
+        """Extracts keywords (up to 12) and bigrams (up to 4) from text in one pass"""
+        stop_words = self._stop_words
         keywords = []
+        bigrams = []
         seen = set()
+        prev = None
+        prev_is_stop = True
         
-        for token in tokens:
-            if len(token) < 4 or token in self._stop_words:
-                continue
-            if token not in seen:
+        for token in _TOKEN_RE.findall(text.lower()):
+            is_stop = token in stop_words
+            if len(keywords) < 12 and not is_stop and len(token) >= 4 and token not in seen:
                 seen.add(token)
                 keywords.append(token)
-            if len(keywords) >= 12:
-                break
-        
-        
-        bigrams = []
-        for i in range(len(tokens) - 1):
-            a, b = tokens[i], tokens[i + 1]
-            if a in self._stop_words or b in self._stop_words:
-                continue
-            phrase = f"{a} {b}"
-            if len(phrase) >= 8:
-                bigrams.append(phrase)
-            if len(bigrams) >= 4:
+            if len(bigrams) < 4 and prev is not None and not prev_is_stop and not is_stop:
+                phrase = f"{prev} {token}"
+                if len(phrase) >= 8:
+                    bigrams.append(phrase)
+            if len(keywords) >= 12 and len(bigrams) >= 4:
                 break
+            prev = token
+            prev_is_stop = is_stop
         
         combined = keywords + bigrams
         return ", ".join(combined[:15])
     
     def _encode_text(self, text: str) -> torch.Tensor:
         """Encodes text into embedding"""
-        return self.model.encode(text, convert_to_tensor=True)
+        return self._encode_texts([text])[0]
+    
+    def _encode_texts(self, texts: List[str]) -> torch.Tensor:
+        """Encodes query texts through an LRU cache; only misses reach the encoder"""
+        with self._cache_lock:
+            cached = {}
+            for text in texts:
+                emb = self._query_cache.get(text)
+                if emb is not None:
+                    self._query_cache.move_to_end(text)
+                    cached[text] = emb
+        
+        misses = list(dict.fromkeys(text for text in texts if text not in cached))
+        if misses:
+            encoded = self._encode_batched(misses)
+            with self._cache_lock:
+                for text, emb in zip(misses, encoded):
+                    cached[text] = emb
+                    self._query_cache[text] = emb
+                while len(self._query_cache) > _QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        
+        return torch.stack([cached[text] for text in texts])
+    
+    def _encode_batched(self, texts: List[str]) -> torch.Tensor:
+        """Queues texts for the batching worker so concurrent callers share one encoder pass"""
+        if self._batch_thread is None:
+            return self._encode_uncached(texts)
+        future: Future = Future()
+        self._batch_queue.put((texts, future))
+        return future.result()
+    
+    def _batch_worker(self) -> None:
+        """Drains up to _BATCH_MAX_REQUESTS requests or waits _BATCH_WAIT_S, then encodes them together"""
+        while True:
+            requests = [self._batch_queue.get()]
+            deadline = time.monotonic() + _BATCH_WAIT_S
+            while len(requests) < _BATCH_MAX_REQUESTS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    requests.append(self._batch_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            try:
+                embs = self._encode_uncached([text for texts, _future in requests for text in texts])
+            except Exception as e:
+                for _texts, future in requests:
+                    future.set_exception(e)
+                continue
+            
+            offset = 0
+            for texts, future in requests:
+                future.set_result(embs[offset:offset + len(texts)])
+                offset += len(texts)
+    
+    @torch.inference_mode()
+    def _encode_uncached(self, texts: List[str]) -> torch.Tensor:
+        """Encodes query texts, preferring ONNX, then frozen TorchScript, then eager model"""
+        if self.text_encoder is not None:
+            return self.text_encoder.encode(texts).to(self.model.device)
+        return self.model.encode(texts, batch_size=len(texts), convert_to_tensor=True)
     
-    def _merge_hits(self, hits, source_label: str, storage: dict) -> None:
-        """Merges search results"""
-        for hit in hits[0]:
-            idx = hit["corpus_id"]
-            entry = storage.setdefault(idx, {"scores": {}, "frame": self.frames[idx]})
-            score = float(hit["score"])
-            entry["scores"][source_label] = max(entry["scores"].get(source_label, 0.0), score)
+    def _supports_images(self) -> bool:
+        """Checks whether the loaded model has an image tower (CLIPModel first module)"""
+        try:
+            from sentence_transformers.models import CLIPModel
+        except ImportError:
+            return False
+        return isinstance(self.model[0], CLIPModel)
+    
+    def _encode_images(self, image_paths: List[str], batch_size: int) -> torch.Tensor:
+        """Encodes frame images, decoding JPEGs in DataLoader workers ahead of the encoder"""
+        if not self._supports_images():
+            return self.model.encode(
+                image_paths,
+                batch_size=batch_size,
+                convert_to_tensor=True,
+                show_progress_bar=True
+            )
+        
+        num_workers = 0 if getattr(sys, "frozen", False) else min(8, os.cpu_count() or 1)
+        loader = DataLoader(
+            _ImageDataset(image_paths),
+            batch_size=batch_size,
+            num_workers=num_workers,
+            collate_fn=list,
+            prefetch_factor=4 if num_workers else None
+        )
+        chunks = [
+            self.model.encode(images, batch_size=len(images), convert_to_tensor=True)
+            for images in loader
+        ]
+        return torch.cat(chunks)
     
     def _feedback_key(self, frame: VisualFrame) -> str:
         """Generates feedback key"""
         ts = round(frame.timestamp, 2)
         return f"{frame.video_filename}|{ts}"
     
+    def _apply_feedback(self, key: str, is_positive: bool) -> None:
+        """Moves key into positive or negative feedback set"""
+        if is_positive:
+            self.feedback["negative"].discard(key)
+            self.feedback["positive"].add(key)
+        else:
+            self.feedback["positive"].discard(key)
+            self.feedback["negative"].add(key)
+    
     def _load_feedback(self) -> None:
-        """Loads feedback from file"""
-        if not os.path.exists(self.feedback_file):
-            return
+        """Loads feedback snapshot and replays the append-only log"""
+        if os.path.exists(self.feedback_file):
+            try:
+                with open(self.feedback_file, "rb") as f:
+                    data = _json_loads(f.read())
+                self.feedback["positive"] = set(data.get("positive", []))
+                self.feedback["negative"] = set(data.get("negative", []))
+            except Exception:
+                pass
         
+        if not os.path.exists(self.feedback_log_file):
+            return
         try:
-            with open(self.feedback_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.feedback["positive"] = set(data.get("positive", []))
-            self.feedback["negative"] = set(data.get("negative", []))
+            with open(self.feedback_log_file, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = _json_loads(line)
+                    except ValueError:
+                        continue
+                    self._apply_feedback(entry["key"], entry["pol"] == "pos")
+                    self._feedback_log_entries += 1
         except Exception:
             pass
     
-    def _persist_feedback(self) -> None:
-        """Saves feedback to file"""
-        os.makedirs(os.path.dirname(self.feedback_file), exist_ok=True)
+    def _append_feedback_log(self, key: str, is_positive: bool) -> None:
+        """Appends one feedback event to JSONL log"""
+        os.makedirs(os.path.dirname(self.feedback_log_file) or ".", exist_ok=True)
+        with open(self.feedback_log_file, "ab") as f:
+            f.write(_json_dumps({"key": key, "pol": "pos" if is_positive else "neg"}) + b"\n")
+        self._feedback_log_entries += 1
+    
+    def _compact_feedback(self) -> None:
+        """Writes a fresh snapshot and truncates the feedback log"""
+        os.makedirs(os.path.dirname(self.feedback_file) or ".", exist_ok=True)
         data = {
             "positive": sorted(self.feedback["positive"]),
             "negative": sorted(self.feedback["negative"]),
         }
-        with open(self.feedback_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp_file = self.feedback_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(_json_dumps(data))
+        os.replace(tmp_file, self.feedback_file)
+        open(self.feedback_log_file, "wb").close()
+        self._feedback_log_entries = 0
     
     def _load_or_index_images(self) -> None:
         """Loads or creates frame embeddings"""
@@ -215,100 +600,79 @@ class ClipSearchEngine(ISearchEngine):
         
         if os.path.exists(self.cache_file) and len(self.frames) > 0:
             try:
-                cached_emb = np.load(self.cache_file)
-                if len(cached_emb) == len(self.frames):
-                    self.embeddings = torch.from_numpy(cached_emb)
+                self.embeddings = self._load_embeddings(self.cache_file, len(self.frames))
+                if self.embeddings is not None:
                     print(f"⚡️ Кэш векторов загружен ({len(self.embeddings)} шт).")
                     return
-                else:
-                    os.remove(self.cache_file)
             except Exception:
                 pass
         
         self._run_full_indexing()
     
+    @torch.inference_mode()
     def _run_full_indexing(self) -> None:
         """Performs full frame indexing"""
         print(f"📊 Индексирую {len(self.frames)} ключевых кадров...")
         image_paths = []
+        sizes = []
         valid_frames = []
+        existing = _scan_existing(frame.frame_path for frame in self.frames)
         
         for frame in self.frames:
-            if os.path.exists(frame.frame_path):
-                image_paths.append(frame.frame_path)
-                valid_frames.append(frame)
+            entry = existing.get(frame.frame_path)
+            if entry is None:
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            image_paths.append(frame.frame_path)
+            sizes.append(size)
+            valid_frames.append(frame)
         
         self.frames = valid_frames
         if image_paths:
             print(f"🚀 Начинаю обработку {len(image_paths)} файлов...")
-            self.embeddings = self.model.encode(
-                image_paths, 
-                batch_size=32, 
-                convert_to_tensor=True, 
-                show_progress_bar=True
-            )
-            np.save(self.cache_file, self.embeddings.cpu().numpy())
+            order = sorted(range(len(image_paths)), key=sizes.__getitem__)
+            sorted_embeddings = self._encode_images([image_paths[i] for i in order], batch_size=32)
+            inverse = torch.empty(len(order), dtype=torch.long)
+            inverse[torch.tensor(order, dtype=torch.long)] = torch.arange(len(order))
+            self.embeddings = self._prepare_corpus(sorted_embeddings[inverse.to(sorted_embeddings.device)])
+            self._save_embeddings(self.cache_file, self.embeddings)
             print("✅ Индексация завершена и сохранена в кэш.")
         else:
             print("❌ Ошибка: Нет файлов для индексации.")
     
     def search_segments(self, query_text: str, limit: int = 5) -> List[Tuple[VideoSegment, float]]:
         """Searches segments by text query with averaging of key_frames embeddings"""
-        if not self.is_ready() or not self.segments or self.segment_embeddings is None:
-            return []
-        
-        aggregated_hits = {}
-        query_text = query_text.strip()
-        
-        tag_query = self._extract_tags_internal(query_text)
-        
-        if query_text:
-            text_emb = self.model.encode(query_text, convert_to_tensor=True)
-            text_hits = util.semantic_search(
-                text_emb, self.segment_embeddings, top_k=max(limit * 3, 15)
-            )
-            self._merge_segment_hits(text_hits, "text", aggregated_hits)
-        
-        if tag_query:
-            tag_emb = self.model.encode(tag_query, convert_to_tensor=True)
-            tag_hits = util.semantic_search(
-                tag_emb, self.segment_embeddings, top_k=max(limit * 2, 10)
-            )
-            self._merge_segment_hits(tag_hits, "tags", aggregated_hits)
-        
-        results = []
-        for data in aggregated_hits.values():
-            scores = data["scores"]
-            combined = sum(
-                self._weights.get(source, 0.0) * score 
-                for source, score in scores.items()
-            )
-            if "text" not in scores:
-                combined *= 0.8
-            results.append((data["segment"], combined))
-        
-        adjusted = []
-        for segment, score in results:
-            if segment.key_frames:
-                key = self._feedback_key(segment.key_frames[0])
-                if key in self.feedback["negative"]:
-                    score *= 0.2
-                elif key in self.feedback["positive"]:
-                    score *= 1.25
-            
-            final_score = max(0.0, min(score, 1.0))
-            adjusted.append((segment, final_score))
-        
-        adjusted.sort(key=lambda item: item[1], reverse=True)
-        return adjusted[:limit]
+        return self.batch_search_segments([query_text], limit)[0]
     
-    def _merge_segment_hits(self, hits, source_label: str, storage: dict) -> None:
-        """Merges segment search results"""
-        for hit in hits[0]:
-            idx = hit["corpus_id"]
-            entry = storage.setdefault(idx, {"scores": {}, "segment": self.segments[idx]})
-            score = float(hit["score"])
-            entry["scores"][source_label] = max(entry["scores"].get(source_label, 0.0), score)
+    def batch_search_segments(
+        self,
+        query_texts: List[str],
+        limit: int = 5
+    ) -> List[List[Tuple[VideoSegment, float]]]:
+        """Searches segments for several text queries with one encoder pass per query kind"""
+        if not self.is_ready() or not self.segments or self.segment_embeddings is None:
+            return [[] for _ in query_texts]
+        
+        queries = [query_text.strip() for query_text in query_texts]
+        tag_queries = [self._extract_tags_internal(query_text) for query_text in queries]
+        
+        text_hits, tag_hits = self._batch_semantic_search(
+            [queries, tag_queries],
+            self.segment_embeddings,
+            [max(limit * 3, 15), max(limit * 2, 10)]
+        )
+        
+        segments = self.segments
+        return [
+            [
+                (segments[idx], score)
+                for idx, score in self._rank_hits(query_text_hits, query_tag_hits, self._segment_feedback_mult, limit)
+            ]
+            for query_text_hits, query_tag_hits in zip(text_hits, tag_hits)
+        ]
     
     def record_segment_feedback(self, segment: VideoSegment, is_positive: bool) -> None:
         """Saves feedback for segment"""
@@ -326,53 +690,48 @@ class ClipSearchEngine(ISearchEngine):
         
         if os.path.exists(segments_cache_file) and len(self.segments) > 0:
             try:
-                cached_emb = np.load(segments_cache_file)
-                if len(cached_emb) == len(self.segments):
-                    self.segment_embeddings = torch.from_numpy(cached_emb)
+                self.segment_embeddings = self._load_embeddings(segments_cache_file, len(self.segments))
+                if self.segment_embeddings is not None:
                     print(f"⚡️ Кэш векторов сегментов загружен ({len(self.segment_embeddings)} шт).")
                     return
-                else:
-                    os.remove(segments_cache_file)
             except Exception:
                 pass
         
         self._run_segment_indexing(segments_cache_file)
     
+    @torch.inference_mode()
     def _run_segment_indexing(self, cache_file: str) -> None:
         """Performs full segment indexing with averaging of key_frames embeddings"""
         print(f"📊 Индексирую {len(self.segments)} сегментов...")
         
-        segment_embeddings_list = []
+        all_paths = []
+        spans = []
         valid_segments = []
+        existing = _scan_existing(
+            frame.frame_path for segment in self.segments for frame in segment.key_frames
+        )
         
         for segment in self.segments:
-            key_frame_paths = []
+            start = len(all_paths)
             for frame in segment.key_frames:
-                if os.path.exists(frame.frame_path):
-                    key_frame_paths.append(frame.frame_path)
+                if frame.frame_path in existing:
+                    all_paths.append(frame.frame_path)
             
-            if not key_frame_paths:
+            if len(all_paths) == start:
                 continue
             
-            frame_embeddings = self.model.encode(
-                key_frame_paths,
-                batch_size=32,
-                convert_to_tensor=True,
-                show_progress_bar=False
-            )
-            
-            if len(frame_embeddings.shape) == 1:
-                segment_emb = frame_embeddings
-            else:
-                segment_emb = torch.mean(frame_embeddings, dim=0)
-            
-            segment_embeddings_list.append(segment_emb.cpu().numpy())
+            spans.append((start, len(all_paths) - start))
             valid_segments.append(segment)
         
-        if segment_embeddings_list:
+        if spans:
+            all_embs = self._encode_images(all_paths, batch_size=64).float().cpu().numpy()
+            segment_embeddings = np.empty((len(spans), all_embs.shape[1]), dtype=np.float32)
+            for i, (start, count) in enumerate(spans):
+                all_embs[start:start + count].mean(axis=0, out=segment_embeddings[i])
+            
             self.segments = valid_segments
-            self.segment_embeddings = torch.from_numpy(np.array(segment_embeddings_list))
-            np.save(cache_file, self.segment_embeddings.cpu().numpy())
+            self.segment_embeddings = self._prepare_corpus(torch.from_numpy(segment_embeddings))
+            self._save_embeddings(cache_file, self.segment_embeddings)
             print(f"✅ Индексация сегментов завершена и сохранена в кэш ({len(self.segments)} шт).")
         else:
             print("❌ Ошибка: Нет валидных сегментов для индексации.")
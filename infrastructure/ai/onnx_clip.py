@@ -0,0 +1,126 @@
+"""ONNX Runtime text encoder for CLIP queries (INT8, optional dependency)"""
+import copy
+import json
+import os
+from typing import List, Optional
+import numpy as np
+import torch
+
+_EXPORT_VERSION = 1
+
+
+class _SentenceEmbeddingModule(torch.nn.Module):
+    """Wraps SentenceTransformer pipeline as (input_ids, attention_mask) -> embedding"""
+    
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        features = self.model({"input_ids": input_ids, "attention_mask": attention_mask})
+        return features["sentence_embedding"]
+
+
+def cpu_copy(model):
+    """Returns model on CPU, copying it so a shared CUDA model isn't moved"""
+    if model.device.type == "cpu":
+        return model
+    return copy.deepcopy(model).cpu()
+
+
+def export_metadata(path: str) -> Optional[dict]:
+    """Reads metadata sidecar of an exported encoder; None if missing or unreadable"""
+    try:
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_export_metadata(path: str, metadata: dict) -> None:
+    """Writes metadata sidecar next to an exported encoder"""
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+
+
+class OnnxTextEncoder:
+    """Encodes query texts with an INT8-quantized ONNX export of the text model"""
+    
+    def __init__(self, session, tokenizer, max_length: int):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+    
+    def encode(self, texts: List[str]) -> torch.Tensor:
+        """Encodes texts into embeddings tensor [len(texts), dim]"""
+        batch = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        outputs = self.session.run(None, {
+            "input_ids": batch["input_ids"].astype(np.int64),
+            "attention_mask": batch["attention_mask"].astype(np.int64),
+        })
+        return torch.from_numpy(outputs[0])
+    
+    @classmethod
+    def load_or_export(
+        cls,
+        model,
+        onnx_path: str,
+        model_name: str,
+        allow_export: bool = False
+    ) -> Optional["OnnxTextEncoder"]:
+        """Loads cached ONNX model built from model_name, or exports it when allowed; None if unavailable"""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            return None
+        
+        metadata = {"model": model_name, "version": _EXPORT_VERSION}
+        try:
+            if export_metadata(onnx_path) != metadata or not os.path.exists(onnx_path):
+                if not allow_export:
+                    return None
+                cls._export(model, onnx_path)
+                save_export_metadata(onnx_path, metadata)
+            session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        except Exception as e:
+            print(f"⚠️ ONNX encoder unavailable, using PyTorch: {e}")
+            return None
+        return cls(session, model.tokenizer, model.max_seq_length)
+    
+    @staticmethod
+    def _export(model, onnx_path: str) -> None:
+        """Exports text pipeline to ONNX and applies dynamic INT8 quantization"""
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        print("🧠 Exporting CLIP text encoder to ONNX (one-time, 1/2)...")
+        os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+        fp32_path = onnx_path + ".fp32"
+        module = _SentenceEmbeddingModule(cpu_copy(model)).eval()
+        sample = model.tokenizer(["sample query"], return_tensors="pt")
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    module,
+                    (sample["input_ids"], sample["attention_mask"]),
+                    fp32_path,
+                    input_names=["input_ids", "attention_mask"],
+                    output_names=["sentence_embedding"],
+                    dynamic_axes={
+                        "input_ids": {0: "batch", 1: "sequence"},
+                        "attention_mask": {0: "batch", 1: "sequence"},
+                        "sentence_embedding": {0: "batch"},
+                    },
+                    opset_version=14
+                )
+            print("🧠 Quantizing ONNX text encoder to INT8 (2/2)...")
+            quantize_dynamic(fp32_path, onnx_path, weight_type=QuantType.QInt8)
+            print("✅ ONNX text encoder saved")
+        finally:
+            if os.path.exists(fp32_path):
+                os.remove(fp32_path)
@@ -0,0 +1,69 @@
+"""Frozen TorchScript text encoder for CLIP queries"""
+import os
+from typing import List, Optional
+import torch
+from .onnx_clip import _SentenceEmbeddingModule, cpu_copy, export_metadata, save_export_metadata
+
+_TRACE_VERSION = 1
+
+
+class TorchScriptTextEncoder:
+    """Encodes query texts with a traced and frozen copy of the text model"""
+    
+    def __init__(self, module: torch.jit.ScriptModule, tokenizer, max_length: int):
+        self.module = module
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+    
+    def encode(self, texts: List[str]) -> torch.Tensor:
+        """Encodes texts into embeddings tensor [len(texts), dim]"""
+        batch = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        with torch.inference_mode():
+            return self.module(batch["input_ids"], batch["attention_mask"])
+    
+    @classmethod
+    def load_or_trace(
+        cls,
+        model,
+        module_path: str,
+        model_name: str,
+        allow_export: bool = False
+    ) -> Optional["TorchScriptTextEncoder"]:
+        """Loads cached frozen module built from model_name, or traces it when allowed; None on failure"""
+        metadata = {"model": model_name, "version": _TRACE_VERSION}
+        try:
+            if export_metadata(module_path) == metadata and os.path.exists(module_path):
+                module = torch.jit.load(module_path, map_location="cpu")
+            elif allow_export:
+                module = cls._trace(model, module_path)
+                save_export_metadata(module_path, metadata)
+            else:
+                return None
+        except Exception as e:
+            print(f"⚠️ TorchScript encoder unavailable, using eager PyTorch: {e}")
+            return None
+        return cls(module, model.tokenizer, model.max_seq_length)
+    
+    @staticmethod
+    def _trace(model, module_path: str) -> torch.jit.ScriptModule:
+        """Traces text pipeline on CPU, freezes it and saves to disk"""
+        print("🧠 Freezing CLIP text encoder with TorchScript (one-time)...")
+        os.makedirs(os.path.dirname(module_path) or ".", exist_ok=True)
+        wrapper = _SentenceEmbeddingModule(cpu_copy(model)).eval()
+        sample = model.tokenizer(["sample query", "another sample query"], padding=True, return_tensors="pt")
+        with torch.no_grad():
+            traced = torch.jit.trace(
+                wrapper,
+                (sample["input_ids"], sample["attention_mask"]),
+                strict=False
+            )
+            frozen = torch.jit.freeze(traced.eval())
+        frozen.save(module_path)
+        print("✅ TorchScript text encoder saved")
+        return frozen
@@ -1,235 +1,678 @@
 """Video indexing and frame extraction"""
+import hashlib
+import json
 import os
 import re
+from functools import lru_cache
 import cv2
-from scenedetect import VideoManager, SceneManager
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from scenedetect import FrameTimecode, VideoManager, SceneManager
 from scenedetect.detectors import ContentDetector
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 from domain import IVideoIndexer, VisualFrame, VideoSegment
 from infrastructure.localization import _
 
+try:
+    import av
+except ImportError:
+    av = None
+
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_420
+except ImportError:
+    TurboJPEG = None
+
+_SEEK_GAP_FRAMES = 250
+_INVALID_CHARS_RE = re.compile(r'[^\w\s\.\-\']')
+_SEPARATORS_RE = re.compile(r'[\s_]+')
+_FRAME_HEIGHT = 360
+_MIN_PARALLEL_SCENES = 8
+_SCENE_CACHE_HEAD_BYTES = 1 << 20
+_SEGMENT_POSITIONS = ("start", "middle", "end")
+
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+cv2.setNumThreads(1)
+
+
+@lru_cache(maxsize=1)
+def _turbo_jpeg() -> Optional["TurboJPEG"]:
+    """Returns shared libjpeg-turbo encoder, or None if the library can't be loaded"""
+    if TurboJPEG is None:
+        return None
+    try:
+        return TurboJPEG()
+    except Exception:
+        return None
+
+
 class VideoIndexer(IVideoIndexer):
     """Extracts key frames from video"""
     
-    def __init__(self, frames_dir: str = "data/frames"):
+    def __init__(
+        self,
+        frames_dir: str = "data/frames",
+        use_cuda: Optional[bool] = None,
+        detect_downscale: int = 0,
+        detect_frame_skip: int = 0,
+        scene_workers: int = 0,
+        single_pass: bool = False,
+        scene_cache_dir: Optional[str] = "data/scene_cache"
+    ):
         self.frames_dir = os.path.abspath(frames_dir)
+        self.detect_downscale = detect_downscale
+        self.detect_frame_skip = max(0, detect_frame_skip)
+        self.use_cuda = self._cuda_available() if use_cuda is None else use_cuda
+        self.scene_workers = max(0, scene_workers)
+        self.single_pass = single_pass
+        self.scene_cache_dir = os.path.abspath(scene_cache_dir) if scene_cache_dir else None
+        self._create_pools()
         self._ensure_directory()
     
+    def _create_pools(self) -> None:
+        """Creates JPEG write thread pool; scene process pool is started on first use"""
+        self._write_pool = ThreadPoolExecutor(max_workers=min(16, os.cpu_count() or 1))
+        self._scene_pool: Optional[ProcessPoolExecutor] = None
+        self._scene_pool_lock = threading.Lock()
+    
+    def __getstate__(self) -> dict:
+        """Drops pools so the indexer can be sent to worker processes"""
+        state = self.__dict__.copy()
+        del state["_write_pool"]
+        del state["_scene_pool"]
+        del state["_scene_pool_lock"]
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        """Restores state and recreates pools"""
+        self.__dict__.update(state)
+        self._create_pools()
+    
+    def _get_scene_pool(self) -> ProcessPoolExecutor:
+        """Returns process pool shared by all videos decoded through this indexer"""
+        with self._scene_pool_lock:
+            if self._scene_pool is None:
+                self._scene_pool = ProcessPoolExecutor(
+                    max_workers=self.scene_workers,
+                    initializer=_init_scene_worker,
+                    initargs=(max(1, (os.cpu_count() or 1) // self.scene_workers),)
+                )
+            return self._scene_pool
+    
+    def close(self) -> None:
+        """Shuts down the scene process pool; it is restarted on next use"""
+        with self._scene_pool_lock:
+            pool, self._scene_pool = self._scene_pool, None
+        if pool is not None:
+            pool.shutdown()
+    
     def _ensure_directory(self) -> None:
         """Creates directory for frames"""
-        if not os.path.exists(self.frames_dir):
-            try:
-                os.makedirs(self.frames_dir)
-            except OSError as e:
-                print(_("video_indexer_create_dir_error_crit", error=e))
+        try:
+            os.makedirs(self.frames_dir, exist_ok=True)
+        except OSError as e:
+            print(_("video_indexer_create_dir_error_crit", error=e))
     
-    def _sanitize_filename(self, filename: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _sanitize_filename(filename: str) -> str:
         """Cleans filename from invalid characters"""
         name, ext = os.path.splitext(filename)
-        clean_name = re.sub(r'[^\w\s\.\-\']', '_', name)
-        clean_name = re.sub(r'[\s_]+', '_', clean_name).strip('_')
+        clean_name = _INVALID_CHARS_RE.sub('_', name)
+        clean_name = _SEPARATORS_RE.sub('_', clean_name).strip('_')
         return clean_name + ext
     
-    def extract_frames(self, video_path: str, threshold: float = 27.0) -> List[VisualFrame]:
+    @staticmethod
+    def _frame_skip(video_manager: VideoManager, target_fps: Optional[float]) -> int:
+        """Number of frames to skip between analyzed frames to sample at target_fps; skipping lowers cut accuracy"""
+        if not target_fps or target_fps <= 0:
+            return 0
+        fps = video_manager.get_framerate()
+        if not fps or fps <= target_fps:
+            return 0
+        return int(fps / target_fps) - 1
+    
+    @staticmethod
+    def _cuda_available() -> bool:
+        """Checks for an OpenCV build with cudacodec and a CUDA device"""
+        try:
+            return hasattr(cv2, "cudacodec") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except Exception:
+            return False
+    
+    def _detect_scenes(
+        self,
+        video_path: str,
+        threshold: float,
+        target_fps: Optional[float],
+        on_cut: Optional[Callable[[np.ndarray, int], None]] = None
+    ) -> Tuple[list, float]:
+        """Runs content scene detection; returns scene list and video frame rate.
+        on_cut receives each full-resolution cut frame, so detection isn't downscaled then"""
+        video_manager = VideoManager([video_path])
+        try:
+            scene_manager = SceneManager()
+            scene_manager.add_detector(ContentDetector(threshold=threshold))
+            self._set_detect_downscale(video_manager, scene_manager, 1 if on_cut else self.detect_downscale)
+            video_manager.start()
+            detect_kwargs = {"callback": on_cut} if on_cut else {}
+            scene_manager.detect_scenes(
+                frame_source=video_manager,
+                frame_skip=max(self.detect_frame_skip, self._frame_skip(video_manager, target_fps)),
+                show_progress=True,
+                **detect_kwargs
+            )
+            scene_list = scene_manager.get_scene_list()
+            print(_("video_indexer_scenes_found", count=len(scene_list)))
+            return scene_list, video_manager.get_framerate()
+        finally:
+            video_manager.release()
+    
+    def _detect_scenes_cached(self, video_path: str, threshold: float, target_fps: Optional[float]) -> Tuple[list, float]:
+        """Returns scene list and frame rate from disk cache, running detection on a miss"""
+        if not self.scene_cache_dir:
+            return self._detect_scenes(video_path, threshold, target_fps)
+        
+        try:
+            cache_path = self._scene_cache_path(video_path, threshold, target_fps)
+        except OSError:
+            return self._detect_scenes(video_path, threshold, target_fps)
+        
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            fps = cached["fps"]
+            scene_list = [(FrameTimecode(start, fps), FrameTimecode(end, fps)) for start, end in cached["scenes"]]
+            print(_("video_indexer_scenes_found", count=len(scene_list)))
+            return scene_list, fps
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        scene_list, fps = self._detect_scenes(video_path, threshold, target_fps)
+        try:
+            os.makedirs(self.scene_cache_dir, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "fps": fps,
+                    "scenes": [[start.get_frames(), end.get_frames()] for start, end in scene_list]
+                }, f)
+        except OSError as e:
+            print(f"⚠️ Scene cache write failed: {e}")
+        return scene_list, fps
+    
+    def _scene_cache_path(self, video_path: str, threshold: float, target_fps: Optional[float]) -> str:
+        """Builds cache file path from video head hash, file size and detection settings"""
+        digest = hashlib.sha1()
+        with open(video_path, "rb") as f:
+            digest.update(f.read(_SCENE_CACHE_HEAD_BYTES))
+        digest.update(f"{os.path.getsize(video_path)}:{target_fps}:{self.detect_frame_skip}:{self.detect_downscale}".encode())
+        return os.path.join(self.scene_cache_dir, f"{digest.hexdigest()}_{threshold}.json")
+    
+    @staticmethod
+    def _set_detect_downscale(video_manager: VideoManager, scene_manager: SceneManager, factor: int) -> None:
+        """Applies detection downscale factor; 0 picks one from the video resolution"""
+        if hasattr(scene_manager, "auto_downscale"):
+            if factor > 0:
+                scene_manager.auto_downscale = False
+                scene_manager.downscale = factor
+        else:
+            video_manager.set_downscale_factor(factor or None)
+    
+    @staticmethod
+    def _scene_frame_arrays(scene_list: list) -> Tuple[np.ndarray, np.ndarray]:
+        """Converts scene timecodes into start and end frame number arrays"""
+        count = len(scene_list)
+        start_fns = np.fromiter((start.get_frames() for start, _end in scene_list), dtype=np.int64, count=count)
+        end_fns = np.fromiter((end.get_frames() for _start, end in scene_list), dtype=np.int64, count=count)
+        return start_fns, end_fns
+    
+    def _frame_source(self, video_path: str, frame_nums: List[int]) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """Picks NVDEC decoding when available, then PyAV, then OpenCV CPU decoding"""
+        if self.use_cuda:
+            try:
+                reader = cv2.cudacodec.createVideoReader(video_path)
+            except Exception as e:
+                print(f"⚠️ CUDA decoder unavailable, using CPU: {e}")
+            else:
+                return self._read_frames_cuda(reader, frame_nums)
+        return self._cpu_frame_source(video_path, frame_nums)
+    
+    @classmethod
+    def _cpu_frame_source(cls, video_path: str, frame_nums: List[int]) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """Picks PyAV decoding when available, OpenCV otherwise"""
+        if av is not None:
+            try:
+                container = av.open(video_path)
+            except Exception as e:
+                print(f"⚠️ PyAV can't open video, using OpenCV: {e}")
+            else:
+                return cls._read_frames_av(container, frame_nums)
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(_("video_indexer_opencv_open_error", video_path=video_path))
+        return cls._read_frames(cap, frame_nums)
+    
+    @staticmethod
+    def _read_frames_cuda(reader, frame_nums: Iterable[int]) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """Decodes on GPU and downsizes there, downloading only 360p BGR frames at ascending indices"""
+        stream = cv2.cuda.Stream()
+        gpu_bgr = cv2.cuda_GpuMat()
+        gpu_resized = cv2.cuda_GpuMat()
+        source_size, target_size = None, None
+        pos = 0
+        last_num, last_image = -1, None
+        for frame_num in frame_nums:
+            if frame_num == last_num:
+                yield frame_num, last_image
+                continue
+            success = frame_num >= pos
+            while success and pos <= frame_num:
+                success, gpu_frame = reader.nextFrame(stream=stream)
+                pos += 1
+            image = None
+            if success:
+                if gpu_frame.size() != source_size:
+                    source_size = gpu_frame.size()
+                    w, h = source_size
+                    target_size = (int(_FRAME_HEIGHT * w / h), _FRAME_HEIGHT)
+                cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR, dst=gpu_bgr, stream=stream)
+                cv2.cuda.resize(gpu_bgr, target_size, dst=gpu_resized, interpolation=cv2.INTER_AREA, stream=stream)
+                image = gpu_resized.download(stream=stream)
+                stream.waitForCompletion()
+            last_num, last_image = frame_num, image
+            yield frame_num, image
+    
+    @staticmethod
+    def _read_frames_av(container, frame_nums: Iterable[int]) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """Decodes with PyAV, converting only target frames to 360p BGR in one swscale pass.
+        Frames are matched by timestamp, so VFR sources and seeks landing before the target stay exact"""
+        try:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            fps = float(stream.average_rate or stream.guessed_rate or 24)
+            time_base = float(stream.time_base)
+            start_pts = stream.start_time or 0
+            start_time = start_pts * time_base
+            tolerance = 0.5 / fps
+            gap_seconds = _SEEK_GAP_FRAMES / fps
+            decoded = container.decode(stream)
+            source_size, target_w = None, None
+            prev_time, last_time, last_image = float("-inf"), None, None
+            for frame_num in frame_nums:
+                target_time = frame_num / fps - tolerance
+                if last_time is not None and prev_time < target_time <= last_time:
+                    yield frame_num, last_image
+                    continue
+                if (last_time is not None and target_time <= prev_time) or \
+                        target_time - (last_time or 0.0) > gap_seconds:
+                    container.seek(start_pts + int(frame_num / fps / time_base), stream=stream)
+                    decoded = container.decode(stream)
+                    prev_time, last_time = float("-inf"), None
+                last_image = None
+                for frame in decoded:
+                    if frame.pts is None:
+                        frame_time = (last_time + 1.0 / fps) if last_time is not None else 0.0
+                    else:
+                        frame_time = frame.pts * time_base - start_time
+                    prev_time, last_time = last_time if last_time is not None else float("-inf"), frame_time
+                    if frame_time < target_time:
+                        continue
+                    if (frame.width, frame.height) != source_size:
+                        source_size = (frame.width, frame.height)
+                        target_w = int(_FRAME_HEIGHT * frame.width / frame.height)
+                    last_image = frame.reformat(
+                        width=target_w,
+                        height=_FRAME_HEIGHT,
+                        format="bgr24",
+                        interpolation="BILINEAR"
+                    ).to_ndarray()
+                    break
+                yield frame_num, last_image
+        finally:
+            container.close()
+    
+    @staticmethod
+    def _read_frames(cap: cv2.VideoCapture, frame_nums: Iterable[int]) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """Reads frames at ascending indices, grabbing forward and seeking only across long gaps"""
+        try:
+            pos = 0
+            last_num, last_image = -1, None
+            for frame_num in frame_nums:
+                if frame_num == last_num:
+                    yield frame_num, last_image
+                    continue
+                if frame_num < pos or frame_num - pos > _SEEK_GAP_FRAMES:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+                    pos = frame_num
+                success = True
+                while success and pos < frame_num:
+                    success = cap.grab()
+                    pos += 1
+                image = None
+                if success and cap.grab():
+                    success, image = cap.retrieve()
+                    if not success:
+                        image = None
+                pos += 1
+                last_num, last_image = frame_num, image
+                yield frame_num, image
+        finally:
+            cap.release()
+    
+    @staticmethod
+    def _fit_height(image: np.ndarray) -> np.ndarray:
+        """Resizes frame to 360p keeping aspect ratio"""
+        h, w = image.shape[:2]
+        target_size = (int(_FRAME_HEIGHT * w / h), _FRAME_HEIGHT)
+        if (w, h) == target_size:
+            return image
+        return cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
+    
+    @staticmethod
+    def _write_frame(filename: str, image: np.ndarray) -> bool:
+        """Encodes JPEG (libjpeg-turbo when available); runs in write pool"""
+        jpeg = _turbo_jpeg()
+        if jpeg is not None:
+            with open(filename, "wb") as f:
+                f.write(jpeg.encode(image, quality=85, jpeg_subsample=TJSAMP_420))
+            return True
+        if cv2.imwrite(filename, image, [cv2.IMWRITE_JPEG_QUALITY, 85]):
+            return True
+        print(_("video_indexer_write_error", filename=filename))
+        return False
+    
+    @staticmethod
+    def _written_frame(scene_idx: int, future: Future, frame: VisualFrame) -> Optional[VisualFrame]:
+        """Waits for frame write; returns the frame if it was saved"""
+        try:
+            return frame if future.result() else None
+        except Exception as e:
+            print(_("video_indexer_process_frame_error", scene_idx=scene_idx, error=e))
+            return None
+    
+    def extract_frames(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> List[VisualFrame]:
         """Extracts key frames from video"""
+        return list(self.iter_frames(video_path, threshold, target_fps))
+    
+    def iter_frames(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> Iterator[VisualFrame]:
+        """Yields key frames from video as they are saved"""
         print(_("video_indexer_analyzing_scenes", video_path=video_path))
         
         video_name = os.path.basename(video_path)
         safe_video_folder_name = self._sanitize_filename(video_name)
         video_frames_dir = os.path.join(self.frames_dir, safe_video_folder_name)
+        frame_prefix = os.path.join(os.path.normpath(video_frames_dir), "")
         
-        if not os.path.exists(video_frames_dir):
-            try:
-                os.makedirs(video_frames_dir)
-            except OSError as e:
-                print(_("video_indexer_create_dir_error_crit", error=e))
-                return []
+        try:
+            os.makedirs(video_frames_dir, exist_ok=True)
+        except OSError as e:
+            print(_("video_indexer_create_dir_error_crit", error=e))
+            return
         
-        frames_data = []
+        cut_writes = []
+        on_cut = None
+        if self.single_pass:
+            def on_cut(frame_im: np.ndarray, frame_num: int) -> None:
+                scene_idx = len(cut_writes) + 1
+                frame_filename = f"{frame_prefix}scene_{scene_idx}_frame_{frame_num}.jpg"
+                future = self._write_pool.submit(self._write_frame, frame_filename, self._fit_height(frame_im))
+                cut_writes.append((scene_idx, frame_num, frame_filename, future))
         
         try:
-            video_manager = VideoManager([video_path])
-            scene_manager = SceneManager()
-            scene_manager.add_detector(ContentDetector(threshold=threshold))
-            video_manager.start()
-            scene_manager.detect_scenes(frame_source=video_manager, show_progress=True)
-            scene_list = scene_manager.get_scene_list()
-            print(_("video_indexer_scenes_found", count=len(scene_list)))
-            video_manager.release()
+            if on_cut is not None:
+                scene_list, fps = self._detect_scenes(video_path, threshold, target_fps, on_cut)
+            else:
+                scene_list, fps = self._detect_scenes_cached(video_path, threshold, target_fps)
         except Exception as e:
             print(_("video_indexer_scene_detect_error", error=e))
-            if 'video_manager' in locals() and video_manager:
-                video_manager.release()
-            return []
+            return
         
         if not scene_list:
             print(_("video_indexer_no_scenes_warning"))
-            return []
+            return
+        
+        if not fps or fps <= 0:
+            fps = 24.0
         
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise IOError(_("video_indexer_opencv_open_error", video_path=video_path))
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            if fps <= 0:
-                fps = 24.0 
+            start_fns, end_fns = self._scene_frame_arrays(scene_list)
+            middle_frame_nums = (start_fns + (end_fns - start_fns) // 2).tolist()
             
             scene_count = 0
-            for i, (start_time, end_time) in enumerate(scene_list):
-                start_frame_num = start_time.get_frames()
-                end_frame_num = end_time.get_frames()
-                middle_frame_num = start_frame_num + int((end_frame_num - start_frame_num) / 2)
-                
-                cap.set(cv2.CAP_PROP_POS_FRAMES, middle_frame_num)
-                success, image = cap.read()
-                
-                if not success:
+            if on_cut is not None:
+                [(_num, first_image)] = list(self._frame_source(video_path, [0]))
+                writes = []
+                if first_image is not None:
+                    frame_filename = f"{frame_prefix}scene_0_frame_0.jpg"
+                    future = self._write_pool.submit(self._write_frame, frame_filename, self._fit_height(first_image))
+                    writes.append((0, 0, frame_filename, future))
+                writes.extend(cut_writes)
+                for i, frame_num, frame_filename, future in writes:
+                    frame = self._written_frame(i, future, VisualFrame(video_name, frame_num / fps, frame_filename))
+                    if frame is not None:
+                        yield frame
+                        scene_count += 1
+                print(_("video_indexer_success", count=scene_count))
+                return
+            
+            if not self.use_cuda and self.scene_workers > 1 and len(middle_frame_nums) >= _MIN_PARALLEL_SCENES:
+                for frame in self._iter_frames_parallel(video_path, video_name, frame_prefix, middle_frame_nums, fps):
+                    yield frame
+                    scene_count += 1
+                print(_("video_indexer_success", count=scene_count))
+                return
+            
+            pending = deque()
+            source_shape, target_size, resize_needed = None, None, True
+            for i, (middle_frame_num, image) in enumerate(self._frame_source(video_path, middle_frame_nums)):
+                if image is None:
                     print(_("video_indexer_read_frame_error", frame_num=middle_frame_num, scene_idx=i))
                     continue
                 
                 timestamp_sec = middle_frame_num / fps
-                frame_filename = os.path.abspath(
-                    os.path.join(video_frames_dir, f"scene_{i}_frame_{middle_frame_num}.jpg")
-                )
+                frame_filename = f"{frame_prefix}scene_{i}_frame_{middle_frame_num}.jpg"
                 
                 try:
-                    h, w, channels = image.shape
-                    target_h = 360
-                    aspect_ratio = w / h
-                    target_w = int(target_h * aspect_ratio)
-                    resized_image = cv2.resize(image, (target_w, target_h))
-                    
-                    if cv2.imwrite(frame_filename, resized_image, [cv2.IMWRITE_JPEG_QUALITY, 85]):
-                        if os.path.exists(frame_filename) and os.path.getsize(frame_filename) > 0:
-                            frames_data.append(VisualFrame(video_name, timestamp_sec, frame_filename))
-                            scene_count += 1
-                        else:
-                            print(_("video_indexer_save_error", filename=frame_filename))
-                    else:
-                        print(_("video_indexer_write_error", filename=frame_filename))
+                    if image.shape[:2] != source_shape:
+                        source_shape = image.shape[:2]
+                        h, w = source_shape
+                        target_size = (int(_FRAME_HEIGHT * w / h), _FRAME_HEIGHT)
+                        resize_needed = (w, h) != target_size
+                    resized_image = cv2.resize(image, target_size, interpolation=cv2.INTER_AREA) if resize_needed else image
+                    future = self._write_pool.submit(self._write_frame, frame_filename, resized_image)
+                    pending.append((i, future, VisualFrame(video_name, timestamp_sec, frame_filename)))
                 except Exception as e:
                     print(_("video_indexer_process_frame_error", scene_idx=i, error=e))
                     continue
+                
+                while pending and pending[0][1].done():
+                    frame = self._written_frame(*pending.popleft())
+                    if frame is not None:
+                        yield frame
+                        scene_count += 1
             
-            cap.release()
-            print(_("video_indexer_success", count=scene_count))
-            return frames_data
+            while pending:
+                frame = self._written_frame(*pending.popleft())
+                if frame is not None:
+                    yield frame
+                    scene_count += 1
             
+            print(_("video_indexer_success", count=scene_count))
+        
         except Exception as e:
-             print(_("video_indexer_scene_detect_error", error=e))
-             if 'cap' in locals() and cap.isOpened():
-                 cap.release()
-             return []
+            print(_("video_indexer_scene_detect_error", error=e))
+            return
     
-    def extract_segments(self, video_path: str, threshold: float = 27.0) -> List[VideoSegment]:
+    def _iter_frames_parallel(
+        self,
+        video_path: str,
+        video_name: str,
+        frame_prefix: str,
+        middle_frame_nums: List[int],
+        fps: float
+    ) -> Iterator[VisualFrame]:
+        """Splits scenes into consecutive chunks decoded in worker processes; yields frames in scene order"""
+        pool = self._get_scene_pool()
+        indexed = list(enumerate(middle_frame_nums))
+        chunk_size = -(-len(indexed) // self.scene_workers)
+        futures = [
+            pool.submit(_extract_frame_chunk, video_path, frame_prefix, indexed[start:start + chunk_size])
+            for start in range(0, len(indexed), chunk_size)
+        ]
+        for future in futures:
+            for frame_num, frame_filename in future.result():
+                yield VisualFrame(video_name, frame_num / fps, frame_filename)
+    
+    def extract_segments(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> List[VideoSegment]:
         """Extracts segments from video with key frames"""
+        return list(self.iter_segments(video_path, threshold, target_fps))
+    
+    def iter_segments(self, video_path: str, threshold: float = 27.0, target_fps: Optional[float] = None) -> Iterator[VideoSegment]:
+        """Yields segments in scene order as soon as their key frames are saved"""
         print(_("video_indexer_analyzing_scenes", video_path=video_path))
         
         video_name = os.path.basename(video_path)
         safe_video_folder_name = self._sanitize_filename(video_name)
         video_frames_dir = os.path.join(self.frames_dir, safe_video_folder_name)
+        frame_prefix = os.path.join(os.path.normpath(video_frames_dir), "")
         
-        if not os.path.exists(video_frames_dir):
-            try:
-                os.makedirs(video_frames_dir)
-            except OSError as e:
-                print(_("video_indexer_create_dir_error_crit", error=e))
-                return []
-        
-        segments_data = []
+        try:
+            os.makedirs(video_frames_dir, exist_ok=True)
+        except OSError as e:
+            print(_("video_indexer_create_dir_error_crit", error=e))
+            return
         
         try:
-            video_manager = VideoManager([video_path])
-            scene_manager = SceneManager()
-            scene_manager.add_detector(ContentDetector(threshold=threshold))
-            video_manager.start()
-            scene_manager.detect_scenes(frame_source=video_manager, show_progress=True)
-            scene_list = scene_manager.get_scene_list()
-            print(_("video_indexer_scenes_found", count=len(scene_list)))
-            video_manager.release()
+            scene_list, fps = self._detect_scenes_cached(video_path, threshold, target_fps)
         except Exception as e:
             print(_("video_indexer_scene_detect_error", error=e))
-            if 'video_manager' in locals() and video_manager:
-                video_manager.release()
-            return []
+            return
         
         if not scene_list:
             print(_("video_indexer_no_scenes_warning"))
-            return []
+            return
         
+        if not fps or fps <= 0:
+            fps = 24.0
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise IOError(_("video_indexer_opencv_open_error", video_path=video_path))
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            if fps <= 0:
-                fps = 24.0
+            start_fns, end_fns = self._scene_frame_arrays(scene_list)
+            start_ts = start_fns / fps
+            end_ts = end_fns / fps
+            scene_count = len(scene_list)
+            target_fns = np.concatenate((start_fns, start_fns + (end_fns - start_fns) // 2, end_fns - 1))
+            target_ts = np.concatenate((start_ts, (start_ts + end_ts) / 2.0, end_ts))
+            target_scenes = np.tile(np.arange(scene_count), 3)
+            target_slots = np.repeat(np.arange(3), scene_count)
+            order = np.lexsort((target_slots, target_scenes, target_fns))
+            targets = zip(
+                target_fns[order].tolist(),
+                target_scenes[order].tolist(),
+                target_slots[order].tolist(),
+                target_ts[order].tolist()
+            )
+            scene_times = list(zip(start_ts.tolist(), end_ts.tolist()))
             
+            scene_writes = [[] for _scene in scene_list]
+            targets_left = [3] * scene_count
+            complete_scenes = deque()
+            next_scene = 0
             segment_count = 0
-            for i, (start_time, end_time) in enumerate(scene_list):
-                start_seconds = start_time.get_seconds()
-                end_seconds = end_time.get_seconds()
-                start_frame_num = start_time.get_frames()
-                end_frame_num = end_time.get_frames()
-                
-                key_frames = []
-                key_positions = [
-                    (start_frame_num, start_seconds, "start"),
-                    (start_frame_num + int((end_frame_num - start_frame_num) / 2), 
-                     (start_seconds + end_seconds) / 2.0, "middle"),
-                    (end_frame_num - 1, end_seconds, "end")
-                ]
-                
-                for frame_num, timestamp_sec, position in key_positions:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-                    success, image = cap.read()
-                    
-                    if not success:
-                        continue
-                    
-                    frame_filename = os.path.abspath(
-                        os.path.join(video_frames_dir, f"segment_{i}_{position}_frame_{frame_num}.jpg")
-                    )
-                    
+            source_shape, target_size, resize_needed = None, None, True
+            images = self._frame_source(video_path, target_fns[order].tolist())
+            for (frame_num, i, slot, timestamp_sec), (_num, image) in zip(targets, images):
+                targets_left[i] -= 1
+                if image is not None:
+                    frame_filename = f"{frame_prefix}segment_{i}_{_SEGMENT_POSITIONS[slot]}_frame_{frame_num}.jpg"
                     try:
-                        h, w, channels = image.shape
-                        target_h = 360
-                        aspect_ratio = w / h
-                        target_w = int(target_h * aspect_ratio)
-                        resized_image = cv2.resize(image, (target_w, target_h))
-                        
-                        if cv2.imwrite(frame_filename, resized_image, [cv2.IMWRITE_JPEG_QUALITY, 85]):
-                            if os.path.exists(frame_filename) and os.path.getsize(frame_filename) > 0:
-                                frame = VisualFrame(video_name, timestamp_sec, frame_filename)
-                                key_frames.append(frame)
+                        if image.shape[:2] != source_shape:
+                            source_shape = image.shape[:2]
+                            h, w = source_shape
+                            target_size = (int(_FRAME_HEIGHT * w / h), _FRAME_HEIGHT)
+                            resize_needed = (w, h) != target_size
+                        resized_image = cv2.resize(image, target_size, interpolation=cv2.INTER_AREA) if resize_needed else image
+                        future = self._write_pool.submit(self._write_frame, frame_filename, resized_image)
+                        scene_writes[i].append((slot, future, VisualFrame(video_name, timestamp_sec, frame_filename)))
                     except Exception as e:
                         print(_("video_indexer_process_frame_error", scene_idx=i, error=e))
-                        continue
                 
-                if key_frames:
-                    preview_frame_path = key_frames[0].frame_path
-                    segment_id = f"{safe_video_folder_name}_segment_{i}"
-                    
-                    segment = VideoSegment(
-                        video_filename=video_name,
-                        start_time=start_seconds,
-                        end_time=end_seconds,
-                        segment_id=segment_id,
-                        preview_frame_path=preview_frame_path,
-                        key_frames=key_frames
-                    )
-                    segments_data.append(segment)
+                while next_scene < scene_count and targets_left[next_scene] == 0:
+                    complete_scenes.append(next_scene)
+                    next_scene += 1
+                while complete_scenes and all(future.done() for _slot, future, _frame in scene_writes[complete_scenes[0]]):
+                    scene_idx = complete_scenes.popleft()
+                    segment = self._build_segment(scene_idx, scene_times[scene_idx], scene_writes[scene_idx], video_name, safe_video_folder_name)
+                    if segment is not None:
+                        yield segment
+                        segment_count += 1
+            
+            complete_scenes.extend(range(next_scene, scene_count))
+            for scene_idx in complete_scenes:
+                segment = self._build_segment(scene_idx, scene_times[scene_idx], scene_writes[scene_idx], video_name, safe_video_folder_name)
+                if segment is not None:
+                    yield segment
                     segment_count += 1
             
-            cap.release()
             print(_("video_indexer_success", count=segment_count))
-            return segments_data
-            
+        
         except Exception as e:
             print(_("video_indexer_scene_detect_error", error=e))
-            if 'cap' in locals() and cap.isOpened():
-                cap.release()
-            return []
\ No newline at end of file
+            return
+    
+    def _build_segment(
+        self,
+        scene_idx: int,
+        scene_time: Tuple[float, float],
+        writes: List[Tuple[int, Future, VisualFrame]],
+        video_name: str,
+        safe_video_folder_name: str
+    ) -> Optional[VideoSegment]:
+        """Waits for scene key frame writes and assembles segment; None if no frame was saved"""
+        key_frames = [None, None, None]
+        for slot, future, frame in writes:
+            key_frames[slot] = self._written_frame(scene_idx, future, frame)
+        key_frames = tuple(frame for frame in key_frames if frame is not None)
+        if not key_frames:
+            return None
+        
+        start_time, end_time = scene_time
+        return VideoSegment(
+            video_filename=video_name,
+            start_time=start_time,
+            end_time=end_time,
+            segment_id=f"{safe_video_folder_name}_segment_{scene_idx}",
+            preview_frame_path=key_frames[0].frame_path,
+            key_frames=key_frames
+        )
+
+
+def _init_scene_worker(cv_threads: int) -> None:
+    """Sets OpenCV thread count for worker process share of CPU cores"""
+    cv2.setNumThreads(cv_threads)
+
+
+def _extract_frame_chunk(video_path: str, frame_prefix: str, chunk: List[Tuple[int, int]]) -> List[Tuple[int, str]]:
+    """Decodes a run of consecutive scene frames and writes them as JPEGs; runs in worker process"""
+    saved = []
+    source_shape, target_size, resize_needed = None, None, True
+    images = VideoIndexer._cpu_frame_source(video_path, [frame_num for _i, frame_num in chunk])
+    for (i, frame_num), (_num, image) in zip(chunk, images):
+        if image is None:
+            print(_("video_indexer_read_frame_error", frame_num=frame_num, scene_idx=i))
+            continue
+        
+        frame_filename = f"{frame_prefix}scene_{i}_frame_{frame_num}.jpg"
+        try:
+            if image.shape[:2] != source_shape:
+                source_shape = image.shape[:2]
+                h, w = source_shape
+                target_size = (int(_FRAME_HEIGHT * w / h), _FRAME_HEIGHT)
+                resize_needed = (w, h) != target_size
+            resized_image = cv2.resize(image, target_size, interpolation=cv2.INTER_AREA) if resize_needed else image
+            if VideoIndexer._write_frame(frame_filename, resized_image):
+                saved.append((frame_num, frame_filename))
+        except Exception as e:
+            print(_("video_indexer_process_frame_error", scene_idx=i, error=e))
+    return saved
\ No newline at end of file
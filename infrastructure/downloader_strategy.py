@@ -3,19 +3,35 @@ Strategy Pattern: Конкретні стратегії завантаження
 Цей файл відповідає тільки за те, ЯК завантажити один конкретний файл.
 """
 import os
+import threading
 import gdown
 import yt_dlp
-import shutil
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from http.client import IncompleteRead
+from typing import Dict, Optional, List, Tuple
+from urllib.parse import urlparse
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 from domain import IDownloadStrategy
 
 from infrastructure.localization import _
 
 VIDEO_FOLDER = "source_videos"
+_RANGE_CONNECTIONS = 8
+_RANGE_SLOTS = threading.BoundedSemaphore(_RANGE_CONNECTIONS)
+_RANGE_MIN_BYTES = 8 << 20
+_RANGE_BLOCK_BYTES = 1 << 20
+_RANGE_TIMEOUT_S = 30
+_RANGE_RETRIES = 2
+
+class _RangeNotSupported(Exception):
+    """Server answered a Range request without partial content."""
 
 class YouTubeStrategy(IDownloadStrategy):
     """Strategy for downloading videos from YouTube via yt-dlp."""
 
+    netlocs = ("youtube.com", "youtu.be")
+
     def can_handle(self, url: str) -> bool:
         return "youtube.com" in url or "youtu.be" in url
 
@@ -23,95 +39,159 @@ class YouTubeStrategy(IDownloadStrategy):
         """Downloads video from YouTube with error handling."""
         print(_("youtube_download_start", url=url))
         
-        formats_to_try = [
-            {
-                'format': 'best[ext=mp4]/best',
-            },
-            {
-                'format': 'best',
-            }
-        ]
-        
-        base_opts = {
+        ydl_opts = {
             'outtmpl': os.path.join(output_folder, '%(title)s.%(ext)s'),
             'noplaylist': True,
             'quiet': True, 
             'no_warnings': True,
             'extractor_args': {'youtube': {'player_client': 'web'}},
             'nocheckcertificate': True,
+            'format': 'best[ext=mp4]/best',
+            'format_sort': ['ext:mp4:m4a', 'res', 'br'],
+            'concurrent_fragment_downloads': 8,
+            'http_chunk_size': 10_485_760,
+            'retries': 5,
+            'fragment_retries': 5,
         }
         
         try:
-            with yt_dlp.YoutubeDL(base_opts) as ydl:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
                 temp_filename = ydl.prepare_filename(info)
                 base, ext = os.path.splitext(temp_filename)
-                final_path = base + ".mp4"
                 
-                if os.path.exists(final_path):
-                    print(f"[YT-DLP] Файл вже існує: {final_path}")
-                    return final_path
-        except Exception:
-            pass
-        
-        for format_config in formats_to_try:
-            try:
-                ydl_opts = {**base_opts, **format_config}
+                expected_mp4 = base + ".mp4"
+                expected_original = temp_filename
+                
+                if os.path.exists(expected_mp4):
+                    print(f"[YT-DLP] Файл вже існує: {expected_mp4}")
+                    return expected_mp4
                 
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    temp_filename = ydl.prepare_filename(info)
-                    base, ext = os.path.splitext(temp_filename)
-                    
-                    expected_mp4 = base + ".mp4"
-                    expected_original = temp_filename
-                    
-                    print(f"[YT-DLP] Починаю завантаження (формат: {format_config['format'][:50]}...)")
-                    ydl.download([url])
-                    
-                    if os.path.exists(expected_mp4):
-                        print(_("download_success", path=expected_mp4))
-                        return expected_mp4
-                    
-                    if os.path.exists(expected_original):
-                        print(_("download_success", path=expected_original))
-                        return expected_original
-                    
-                    base_name = os.path.basename(base)
-                    output_dir = os.path.dirname(expected_mp4) if os.path.dirname(expected_mp4) else output_folder
-                    
-                    if os.path.exists(output_dir):
-                        for file in os.listdir(output_dir):
-                            file_path = os.path.join(output_dir, file)
-                            if (file.startswith(base_name) and 
-                                os.path.isfile(file_path) and 
-                                file.endswith(('.mp4', '.webm', '.mkv', '.m4a', '.mp3'))):
-                                print(f"[YT-DLP] Знайдено файл: {file_path}")
-                                print(_("download_success", path=file_path))
-                                return file_path
-                    
-                    continue
-                    
-            except yt_dlp.utils.DownloadError as e:
-                error_str = str(e)
-                if "ffmpeg" in error_str.lower() or "merge" in error_str.lower():
-                    print(f"[YT-DLP] Формат потребує ffmpeg, пробую інший формат...")
-                    continue
-                else:
-                    print(f"\n{'='*40}")
-                    print(_("youtube_download_error_crit", error=error_str))
-                    print(f"{'='*40}\n")
-                    return None
-            except Exception as e:
-                print(f"[YT-DLP] Помилка з форматом: {e}, пробую інший...")
-                continue
+                print(f"[YT-DLP] Починаю завантаження (формат: {ydl_opts['format']})")
+                if not self._download_ranged(info, expected_original):
+                    ydl.process_ie_result(info, download=True)
+                
+                if os.path.exists(expected_mp4):
+                    print(_("download_success", path=expected_mp4))
+                    return expected_mp4
+                
+                if os.path.exists(expected_original):
+                    print(_("download_success", path=expected_original))
+                    return expected_original
+                
+                base_name = os.path.basename(base)
+                output_dir = os.path.dirname(expected_mp4) if os.path.dirname(expected_mp4) else output_folder
+                
+                if os.path.exists(output_dir):
+                    for file in os.listdir(output_dir):
+                        file_path = os.path.join(output_dir, file)
+                        if (file.startswith(base_name) and 
+                            os.path.isfile(file_path) and 
+                            file.endswith(('.mp4', '.webm', '.mkv', '.m4a', '.mp3'))):
+                            print(f"[YT-DLP] Знайдено файл: {file_path}")
+                            print(_("download_success", path=file_path))
+                            return file_path
+                
+        except yt_dlp.utils.DownloadError as e:
+            print(f"\n{'='*40}")
+            print(_("youtube_download_error_crit", error=str(e)))
+            print(f"{'='*40}\n")
+            return None
+        except Exception as e:
+            print(f"[YT-DLP] Помилка завантаження: {e}")
+            return None
         
         print(f"[YT-DLP] Не вдалося завантажити відео жодним форматом")
         return None
 
+    @staticmethod
+    def _is_progressive_mp4(info: dict) -> bool:
+        """Checks that the selected format is a single HTTP mp4 with audio and video."""
+        return (
+            bool(info.get("url"))
+            and info.get("ext") == "mp4"
+            and info.get("acodec") not in (None, "none")
+            and info.get("vcodec") not in (None, "none")
+            and info.get("protocol") in ("http", "https")
+        )
+
+    def _download_ranged(self, info: dict, path: str) -> bool:
+        """Fetches progressive mp4 with parallel Range requests; False means fall back to yt-dlp.
+        Ranged connections are capped across concurrent downloads; network errors fall back too."""
+        if not self._is_progressive_mp4(info):
+            return False
+
+        url = info["url"]
+        headers = dict(info.get("http_headers") or {})
+        part_path = path + ".part"
+        try:
+            total = info.get("filesize") or self._content_length(url, headers)
+            if not total or total < _RANGE_MIN_BYTES:
+                return False
+
+            chunk = -(-total // _RANGE_CONNECTIONS)
+            ranges = [(start, min(start + chunk, total) - 1) for start in range(0, total, chunk)]
+            with open(part_path, "wb") as f:
+                f.truncate(total)
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                list(pool.map(lambda r: self._fetch_range(url, headers, part_path, r), ranges))
+            os.replace(part_path, path)
+            return True
+        except (OSError, IncompleteRead, _RangeNotSupported) as e:
+            print(f"[YT-DLP] Паралельне завантаження не вдалося, використовую yt-dlp: {e}")
+            self._remove_part(part_path)
+            return False
+        except Exception:
+            self._remove_part(part_path)
+            raise
+
+    @staticmethod
+    def _remove_part(part_path: str) -> None:
+        """Removes partially downloaded file."""
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+    @staticmethod
+    def _content_length(url: str, headers: Dict[str, str]) -> int:
+        """Reads Content-Length with a HEAD request."""
+        with urlopen(Request(url, headers=headers, method="HEAD"), timeout=_RANGE_TIMEOUT_S) as response:
+            return int(response.headers.get("Content-Length") or 0)
+
+    @staticmethod
+    def _fetch_range(url: str, headers: Dict[str, str], path: str, byte_range: Tuple[int, int]) -> None:
+        """Downloads one byte range at its offset in the file, resuming a broken connection up to _RANGE_RETRIES times."""
+        start, end = byte_range
+        offset = start
+        attempt = 0
+        while True:
+            request = Request(url, headers={**headers, "Range": f"bytes={offset}-{end}"})
+            try:
+                with _RANGE_SLOTS, urlopen(request, timeout=_RANGE_TIMEOUT_S) as response, open(path, "r+b") as f:
+                    if response.status != 206:
+                        raise _RangeNotSupported(f"HTTP {response.status} for range {start}-{end}")
+                    f.seek(offset)
+                    while True:
+                        block = response.read(_RANGE_BLOCK_BYTES)
+                        if not block:
+                            break
+                        f.write(block)
+                        offset += len(block)
+                if offset != end + 1:
+                    raise IOError(f"Incomplete range {start}-{end}: {offset - start} bytes")
+                return
+            except HTTPError:
+                raise
+            except (OSError, IncompleteRead) as e:
+                attempt += 1
+                if attempt > _RANGE_RETRIES:
+                    raise
+                print(f"[YT-DLP] Повторюю діапазон {start}-{end} ({attempt}/{_RANGE_RETRIES}): {e}")
+
 class GoogleDriveStrategy(IDownloadStrategy):
     """Strategy for downloading files from Google Drive via gdown."""
 
+    netlocs = ("drive.google.com",)
+
     def can_handle(self, url: str) -> bool:
         return "drive.google.com" in url
 
@@ -120,20 +200,11 @@ class GoogleDriveStrategy(IDownloadStrategy):
         try:
             os.makedirs(output_folder, exist_ok=True)
             
-            output_file = gdown.download(url, output=None, fuzzy=True, quiet=False)
+            output_file = gdown.download(url, output=os.path.join(output_folder, ""), fuzzy=True, quiet=False)
             
             if output_file and os.path.exists(output_file):
-                final_path = os.path.join(output_folder, os.path.basename(output_file))
-                
-                if os.path.exists(final_path):
-                    if os.path.samefile(output_file, final_path):
-                        print(_("download_success", path=final_path))
-                        return final_path
-                    os.remove(final_path)
-                
-                shutil.move(output_file, final_path)
-                print(_("download_success", path=final_path))
-                return final_path
+                print(_("download_success", path=output_file))
+                return output_file
             else:
                 error_msg = f"gdown повернув None або файл не існує. output_file: {output_file}"
                 print(_("drive_download_failed"))
@@ -167,12 +238,25 @@ class VideoDownloader:
             YouTubeStrategy(),
             GoogleDriveStrategy()
         ]
+        self._by_host: Dict[str, IDownloadStrategy] = {
+            host: strategy for strategy in self.strategies for host in strategy.netlocs
+        }
+
+    def _find_strategy(self, url: str) -> Optional[IDownloadStrategy]:
+        """Looks strategy up by URL host and its parent domains, then falls back to can_handle."""
+        host = urlparse(url).hostname or ""
+        while host:
+            strategy = self._by_host.get(host)
+            if strategy is not None:
+                return strategy
+            host = host.partition(".")[2]
+        return next((strategy for strategy in self.strategies if strategy.can_handle(url)), None)
 
     def process_link(self, url: str) -> Optional[str]:
         """Processes link using appropriate strategy."""
-        for strategy in self.strategies:
-            if strategy.can_handle(url):
-                return strategy.download(url, self.folder)
+        strategy = self._find_strategy(url)
+        if strategy is not None:
+            return strategy.download(url, self.folder)
     
         print(_("no_strategy_for_link", url=url))
         return None
\ No newline at end of file
@@ -4,6 +4,8 @@ This file handles LIST of links and GUI interaction (progress, statuses).
 """
 import sys
 import os
+import asyncio
+import threading
 from typing import List, Optional, Callable, Dict, Any
 from domain import IVideoDownloader
 from infrastructure.downloader_strategy import VideoDownloader
@@ -12,8 +14,9 @@ from infrastructure.localization import _
 class VideoDownloaderImpl(IVideoDownloader):
     """Single Responsibility: High-level downloader implementation."""
     
-    def __init__(self, output_dir: str = "source_videos"):
+    def __init__(self, output_dir: str = "source_videos", max_workers: int = 5):
         self.output_dir = output_dir
+        self.max_workers = max(1, max_workers)
         self._strategy_context = VideoDownloader(output_dir)
     
     def download_list(
@@ -23,30 +26,45 @@ class VideoDownloaderImpl(IVideoDownloader):
         progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
         """Downloads list of URLs and returns results."""
+        return asyncio.run(self.download_list_async(urls, output_dir, progress_callback))
+    
+    async def download_list_async(
+        self,
+        urls: List[str],
+        output_dir: str,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Downloads list of URLs concurrently, at most max_workers at a time."""
         
         cleaned_urls = [u.strip() for u in urls if u and u.strip()]
         results: List[Dict[str, Any]] = []
+        emit_lock = threading.Lock()
         
         def _emit(msg_type: str, message: str):
-            if progress_callback:
-                progress_callback(msg_type, message)
-            else:
-                encoding = getattr(sys.stdout, "encoding", "utf-8") or "utf-8"
-                safe_message = message.encode(encoding, errors="ignore").decode(encoding, errors="ignore")
-                print(safe_message)
+            with emit_lock:
+                if progress_callback:
+                    progress_callback(msg_type, message)
+                    return
+                try:
+                    print(message)
+                except UnicodeEncodeError:
+                    encoding = getattr(sys.stdout, "encoding", "utf-8") or "utf-8"
+                    print(str(message).encode(encoding, errors="ignore").decode(encoding, errors="ignore"))
         
         if not cleaned_urls:
             _emit("status", _("no_download_links"))
             return results
         
         total = len(cleaned_urls)
+        progress_step = max(1, total // 100)
         
         def _emit_progress(done: int):
-            _emit("download_progress", {"current": done, "total": total})
+            if done == total or done % progress_step == 0:
+                _emit("download_progress", {"current": done, "total": total})
         
         _emit_progress(0)
         
-        for idx, url in enumerate(cleaned_urls, start=1):
+        def _download(idx: int, url: str) -> Dict[str, Any]:
             _emit("status", _("downloading_file_progress", idx=idx, total=total, url=url))
             
             try:
@@ -54,23 +72,33 @@ class VideoDownloaderImpl(IVideoDownloader):
                 
                 if file_path and os.path.exists(file_path):
                     _emit("log", _("download_success", path=file_path))
-                    results.append({"url": url, "status": "success", "path": file_path})
+                    return {"url": url, "status": "success", "path": file_path}
                 elif file_path:
                     error_msg = f"Файл повернуто, але не знайдено на диску: {file_path}"
                     _emit("error", error_msg)
                     _emit("error", _("download_failed_for_url", url=url))
-                    results.append({"url": url, "status": "error", "path": None, "error": error_msg})
+                    return {"url": url, "status": "error", "path": None, "error": error_msg}
                 else:
                     _emit("error", _("download_failed_for_url", url=url))
-                    results.append({"url": url, "status": "error", "path": None})
-                    
+                    return {"url": url, "status": "error", "path": None}
+            
             except Exception as e:
                 error_msg = f"Несподівана помилка: {type(e).__name__}: {e}"
                 _emit("error", error_msg)
                 import traceback
                 _emit("error", f"Traceback:\n{traceback.format_exc()}")
-                results.append({"url": url, "status": "error", "path": None, "error": error_msg})
-            finally:
-                _emit_progress(idx)
+                return {"url": url, "status": "error", "path": None, "error": error_msg}
+        
+        semaphore = asyncio.Semaphore(self.max_workers)
+        results = [None] * total
+        
+        async def _download_slot(idx: int, url: str) -> None:
+            async with semaphore:
+                results[idx - 1] = await asyncio.to_thread(_download, idx, url)
+        
+        tasks = [_download_slot(idx, url) for idx, url in enumerate(cleaned_urls, start=1)]
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            await task
+            _emit_progress(done)
         
         return results
\ No newline at end of file
@@ -1,6 +1,6 @@
 """Google Docs client"""
+import re
 from typing import Iterator, Optional
-from googleapiclient.discovery import build
 from domain import IDocumentSource, IAuthService, ScenarioBlock
 
 from infrastructure.localization import _
@@ -12,11 +12,18 @@ class GoogleDocsClient(IDocumentSource):
         "Рыба", "Контрасты", "Ссылка", "Insert", "Тизер", 
         "http", "Стендап", "Закадр", "Глава", "Теги от редактора"
     ]
+    _TEXT_FIELDS = (
+        "body/content("
+        "paragraph/elements/textRun/content,"
+        "table/tableRows/tableCells/content/paragraph/elements/textRun/content)"
+    )
+    _IGNORED_RE = re.compile("|".join(re.escape(keyword.lower()) for keyword in IGNORED_KEYWORDS))
     
     def __init__(self, auth_service: IAuthService):
         self.auth_service = auth_service
         self.doc_id: Optional[str] = None
         self.docs_service = None
+        self._credentials = None
         self._connected = False
     
     def connect(self, resource_id: str) -> None:
@@ -30,9 +37,22 @@ class GoogleDocsClient(IDocumentSource):
         if not credentials:
             raise ConnectionError(_("google_no_credentials"))
         
-        self.docs_service = build('docs', 'v1', credentials=credentials)
+        if self.docs_service is None or credentials is not self._credentials:
+            from googleapiclient.discovery import build
+            
+            self.close()
+            self.docs_service = build('docs', 'v1', credentials=credentials, cache_discovery=False)
+            self._credentials = credentials
         self._connected = True
     
+    def close(self) -> None:
+        """Closes the service HTTP connection"""
+        if self.docs_service is not None:
+            self.docs_service.close()
+        self.docs_service = None
+        self._credentials = None
+        self._connected = False
+    
     def is_connected(self) -> bool:
         """Checks connection"""
         return self._connected and self.docs_service is not None
@@ -43,7 +63,10 @@ class GoogleDocsClient(IDocumentSource):
             raise ConnectionError(_("google_not_connected_to_doc"))
         
         try:
-            document = self.docs_service.documents().get(documentId=self.doc_id).execute()
+            document = self.docs_service.documents().get(
+                documentId=self.doc_id,
+                fields=self._TEXT_FIELDS
+            ).execute()
             body_content = document.get('body', {}).get('content', [])
         except Exception as e:
             raise ConnectionError(_("google_doc_read_error", error=e))
@@ -93,9 +116,4 @@ class GoogleDocsClient(IDocumentSource):
         if len(text) < 20:
             return False
         
-        text_lower = text.lower()
-        for keyword in self.IGNORED_KEYWORDS:
-            if keyword.lower() in text_lower:
-                return False
-        
-        return True
\ No newline at end of file
+        return self._IGNORED_RE.search(text.lower()) is None
\ No newline at end of file
@@ -1,13 +1,12 @@
 """OAuth authentication management"""
-import os
 import json
-from typing import Optional, Callable
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
+from typing import TYPE_CHECKING, Optional, Callable
 from domain import IAuthService, ITokenStorage
 from infrastructure.localization import _
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
 class OAuthService(IAuthService):
     """OAuth authentication for Google API"""
     
@@ -25,7 +24,7 @@ class OAuthService(IAuthService):
         self.client_secret_file = client_secret_file
         self.token_storage = token_storage
         self.status_callback = status_callback
-        self.credentials: Optional[Credentials] = None
+        self.credentials: Optional["Credentials"] = None
         self._load_credentials()
     
     def _emit(self, msg: str) -> None:
@@ -43,6 +42,8 @@ class OAuthService(IAuthService):
         token_data = self.token_storage.load_token()
         if token_data:
             try:
+                from google.oauth2.credentials import Credentials
+                
                 token_dict = json.loads(token_data)
                 self.credentials = Credentials.from_authorized_user_info(
                     token_dict,
@@ -55,6 +56,8 @@ class OAuthService(IAuthService):
         """Performs authentication"""
         if self.credentials and self.credentials.expired and self.credentials.refresh_token:
             try:
+                from google.auth.transport.requests import Request
+                
                 self._emit(_("oauth_refreshing_token"))
                 self.credentials.refresh(Request())
                 self._save_credentials()
@@ -63,15 +66,21 @@ class OAuthService(IAuthService):
                 self.credentials = None
         
         if not self.credentials or not self.credentials.valid:
-            if not os.path.exists(self.client_secret_file):
-                return False
-            
-            self._emit(_("oauth_open_browser_prompt"))
             try:
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                
                 flow = InstalledAppFlow.from_client_secrets_file(
                     self.client_secret_file, 
                     self.SCOPES
                 )
+            except FileNotFoundError:
+                return False
+            except Exception as e:
+                self._emit(_("oauth_auth_error", error=e))
+                return False
+            
+            self._emit(_("oauth_open_browser_prompt"))
+            try:
                 self.credentials = flow.run_local_server(port=0, prompt='consent')
                 self._save_credentials()
                 self._emit(_("oauth_auth_success"))
@@ -99,6 +108,6 @@ class OAuthService(IAuthService):
             return False
         return self.credentials.valid
     
-    def get_credentials(self) -> Optional[Credentials]:
+    def get_credentials(self) -> Optional["Credentials"]:
         """Returns credentials"""
         return self.credentials
\ No newline at end of file
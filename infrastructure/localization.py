@@ -2,6 +2,26 @@ import json
 import os
 from typing import Dict, List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(data: bytes):
+    """Parses JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _SafeDict(dict):
+    """Keeps unknown placeholders as-is when formatting templates"""
+    
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
 class LocalizationManager:
     """
     Class for managing multilingual support in the application.
@@ -13,6 +33,7 @@ class LocalizationManager:
         self.locales_dir = locales_dir
         self._current_lang = default_lang
         self.translations: Dict[str, str] = {}
+        self._cache: Dict[str, Dict[str, str]] = {}
         self.load_language(default_lang)
 
     @property
@@ -22,17 +43,33 @@ class LocalizationManager:
 
     def get_available_languages(self) -> List[str]:
         """Scans locales folder and returns list of available language codes."""
-        languages = []
-        if os.path.exists(self.locales_dir):
-            for filename in os.listdir(self.locales_dir):
-                if filename.endswith(".json"):
-                    languages.append(filename[:-5])
-        return sorted(languages)
+        try:
+            with os.scandir(self.locales_dir) as entries:
+                return sorted(
+                    entry.name[:-5] for entry in entries
+                    if entry.name.endswith(".json") and entry.is_file()
+                )
+        except FileNotFoundError:
+            return []
 
     def load_language(self, lang_code: str) -> bool:
         """Loads translation file for specified language."""
+        cached = self._cache.get(lang_code)
+        if cached is not None:
+            self.translations = cached
+            self._current_lang = lang_code
+            print(f"[Localization] Language switched to: {lang_code}")
+            return True
+        
         lang_file = os.path.join(self.locales_dir, f"{lang_code}.json")
-        if not os.path.exists(lang_file):
+        try:
+            with open(lang_file, 'rb') as f:
+                self.translations = _json_loads(f.read())
+            self._cache[lang_code] = self.translations
+            self._current_lang = lang_code
+            print(f"[Localization] Language switched to: {lang_code}")
+            return True
+        except FileNotFoundError:
             print(f"[Localization] Warning: Language file not found: {lang_file}")
             if lang_code != "en" and lang_code != "ru" and lang_code != "uk":
                  print(f"[Localization] Falling back to default")
@@ -40,13 +77,6 @@ class LocalizationManager:
                  if fallback_langs:
                      return self.load_language(fallback_langs[0])
             return False
-
-        try:
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.translations = json.load(f)
-            self._current_lang = lang_code
-            print(f"[Localization] Language switched to: {lang_code}")
-            return True
         except json.JSONDecodeError as e:
              print(f"[Localization] Error parsing JSON for '{lang_code}': {e}")
              self.translations = {}
@@ -56,17 +86,19 @@ class LocalizationManager:
              self.translations = {}
              return False
 
+    def get_template(self, key: str) -> str:
+        """Returns raw translation template for key, to be formatted by caller."""
+        return self.translations.get(key, key)
+
     def get(self, key: str, **kwargs) -> str:
         """Gets translated string by key with formatting support."""
         text = self.translations.get(key, key)
-        if kwargs:
-            try:
-                return text.format(**kwargs)
-            except KeyError as e:
-                return text
-            except ValueError as e:
-                 return text
-        return text
+        if not kwargs or "{" not in text:
+            return text
+        try:
+            return text.format_map(_SafeDict(kwargs))
+        except (ValueError, IndexError):
+            return text
 
 import sys
 if getattr(sys, 'frozen', False):
@@ -78,4 +110,5 @@ LOCALES_PATH = os.path.join(_base_dir, "locales")
 i18n = LocalizationManager(LOCALES_PATH, default_lang="en")
 
 _ = i18n.get
+get_template = i18n.get_template
 
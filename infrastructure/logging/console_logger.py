@@ -1,10 +1,19 @@
 """Infrastructure: Реализация логирования для консоли"""
+import traceback
 from domain import ILogger
 
 
 class ConsoleLogger(ILogger):
     """Console logging implementation"""
     
+    def __init__(self, debug_enabled: bool = False):
+        self.debug_enabled = debug_enabled
+    
+    def debug(self, message: str) -> None:
+        """Отладочное сообщение (только если включено)"""
+        if self.debug_enabled:
+            print(f"[DEBUG] {message}")
+    
     def info(self, message: str) -> None:
         """Информационное сообщение"""
         print(message)
@@ -16,4 +25,8 @@ class ConsoleLogger(ILogger):
     def warning(self, message: str) -> None:
         """Предупреждение"""
         print(f"⚠️ {message}")
-
+    
+    def exception(self, message: str) -> None:
+        """Ошибка с трассировкой текущего исключения"""
+        print(f"❌ {message}")
+        traceback.print_exc()
\ No newline at end of file
@@ -1,7 +1,7 @@
 """Frame and segment storage repository"""
 import os
 import json
-from typing import List
+from typing import Iterable, List, Optional
 from dataclasses import asdict
 from domain import IFrameRepository, VisualFrame, VideoSegment
 
@@ -17,47 +17,133 @@ class VisualFrameRepository(IFrameRepository):
     
     def _ensure_directory(self) -> None:
         """Creates database directory if it doesn't exist"""
-        if not os.path.exists(self.db_dir):
-            os.makedirs(self.db_dir)
+        os.makedirs(self.db_dir, exist_ok=True)
     
-    def save(self, frames: List[VisualFrame]) -> None:
-        """Saves frames to JSON file"""
-        all_data = []
-        if os.path.exists(self.db_file):
-            try:
-                with open(self.db_file, "r", encoding="utf-8") as f:
-                    all_data = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                all_data = []
-        
-        for frame in frames:
-            all_data.append(asdict(frame))
-        
-        with open(self.db_file, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=2)
+    def save(self, frames: Iterable[VisualFrame]) -> None:
+        """Appends frames to NDJSON file, consuming them one at a time"""
+        self._append_records(self.db_file, (asdict(frame) for frame in frames))
     
     def load_all(self) -> List[VisualFrame]:
-        """Loads all frames from JSON file"""
-        if not os.path.exists(self.db_file):
+        """Loads all frames from NDJSON file"""
+        frames = []
+        skipped = 0
+        for item in self._read_records(self.db_file):
+            try:
+                frames.append(VisualFrame(**item))
+            except TypeError:
+                skipped += 1
+        if skipped:
+            print(f"⚠️ Skipped {skipped} invalid frame record(s) in {self.db_file}")
+        return frames
+    
+    def list_indexed_filenames(self) -> set[str]:
+        """Collects indexed video filenames without building frame/segment objects"""
+        filenames = set()
+        for db_file in (self.db_file, self.segments_db_file):
+            filenames.update(self._filenames_of(self._read_records(db_file)))
+        return filenames
+    
+    def prune_missing(self) -> int:
+        """Removes records of non-existent files"""
+        removed, _records = self._prune_frames_db()
+        return removed
+    
+    def prune_missing_and_list(self) -> tuple[int, set[str]]:
+        """Prunes missing frames and lists indexed filenames reading each DB file once"""
+        removed, frame_records = self._prune_frames_db()
+        filenames = self._filenames_of(frame_records)
+        filenames.update(self._filenames_of(self._read_records(self.segments_db_file)))
+        return removed, filenames
+    
+    def last_modified_ns(self) -> Optional[int]:
+        """Returns latest mtime of frame and segment DB files"""
+        latest = 0
+        for db_file in (self.db_file, self.segments_db_file):
+            try:
+                latest = max(latest, os.stat(db_file).st_mtime_ns)
+            except OSError:
+                continue
+        return latest
+    
+    def _read_records(self, db_file: str) -> list:
+        """Reads raw records from DB file (NDJSON, or legacy JSON array)"""
+        if not os.path.exists(db_file):
             return []
-        
         try:
-            with open(self.db_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return [VisualFrame(**item) for item in data]
-        except (json.JSONDecodeError, IOError, TypeError):
+            with open(db_file, "r", encoding="utf-8") as f:
+                if self._is_legacy_array(f):
+                    return json.load(f)
+                records = []
+                skipped = 0
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        skipped += 1
+                if skipped:
+                    print(f"⚠️ Skipped {skipped} corrupt line(s) in {db_file}")
+                return records
+        except (json.JSONDecodeError, IOError):
             return []
     
-    def prune_missing(self) -> int:
-        """Removes records of non-existent files"""
-        if not os.path.exists(self.db_file):
-            return 0
+    @staticmethod
+    def _is_legacy_array(f) -> bool:
+        """Checks whether open file holds a single JSON array; rewinds the file"""
+        head = f.read(64).lstrip()
+        f.seek(0)
+        return head.startswith("[")
+    
+    def _append_records(self, db_file: str, records: Iterable[dict]) -> None:
+        """Appends records as NDJSON lines, migrating a legacy JSON array first"""
+        if os.path.exists(db_file):
+            try:
+                with open(db_file, "r", encoding="utf-8") as f:
+                    legacy = self._is_legacy_array(f)
+            except IOError:
+                legacy = False
+            if legacy:
+                self._write_records(db_file, self._read_records(db_file) + list(records))
+                return
         
+        needs_newline = not self._ends_with_newline(db_file)
+        with open(db_file, "a", encoding="utf-8") as f:
+            if needs_newline:
+                f.write("\n")
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    @staticmethod
+    def _ends_with_newline(db_file: str) -> bool:
+        """Checks that the file is empty or its last line is complete (not cut off mid-append)"""
         try:
-            with open(self.db_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return 0
+            with open(db_file, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return True
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b"\n"
+        except OSError:
+            return True
+    
+    def _write_records(self, db_file: str, records: list) -> None:
+        """Atomically rewrites DB file with given records (compaction)"""
+        tmp_file = db_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        os.replace(tmp_file, db_file)
+    
+    @staticmethod
+    def _filenames_of(records: list) -> set[str]:
+        """Collects video filenames from raw records"""
+        return {item["video_filename"] for item in records if item.get("video_filename")}
+    
+    def _prune_frames_db(self) -> tuple[int, list]:
+        """Drops frame records whose image no longer exists; returns removed count and kept records"""
+        data = self._read_records(self.db_file)
+        if not data:
+            return 0, []
         
         original_len = len(data)
         filtered = [
@@ -67,11 +153,10 @@ class VisualFrameRepository(IFrameRepository):
         removed = original_len - len(filtered)
         
         if removed > 0:
-            with open(self.db_file, "w", encoding="utf-8") as f:
-                json.dump(filtered, f, ensure_ascii=False, indent=2)
+            self._write_records(self.db_file, filtered)
             self._cleanup_empty_dirs()
         
-        return removed
+        return removed, filtered
     
     def _cleanup_empty_dirs(self) -> None:
         """Cleans up empty frame directories"""
@@ -87,15 +172,8 @@ class VisualFrameRepository(IFrameRepository):
                     pass
     
     def save_segments(self, segments: List[VideoSegment]) -> None:
-        """Saves segments to JSON file"""
+        """Appends segments to NDJSON file"""
         all_data = []
-        if os.path.exists(self.segments_db_file):
-            try:
-                with open(self.segments_db_file, "r", encoding="utf-8") as f:
-                    all_data = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                all_data = []
-        
         for segment in segments:
             segment_dict = {
                 "video_filename": segment.video_filename,
@@ -107,26 +185,20 @@ class VisualFrameRepository(IFrameRepository):
             }
             all_data.append(segment_dict)
         
-        with open(self.segments_db_file, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=2)
+        self._append_records(self.segments_db_file, all_data)
     
     def load_all_segments(self) -> List[VideoSegment]:
-        """Loads all segments from JSON file"""
-        if not os.path.exists(self.segments_db_file):
-            return []
-        
+        """Loads all segments from NDJSON file"""
+        data = self._read_records(self.segments_db_file)
         try:
-            with open(self.segments_db_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
             segments = []
             for item in data:
-                key_frames = [
+                key_frames = tuple(
                     VisualFrame(**frame_dict) 
                     for frame_dict in item.get("key_frames", [])
-                ]
+                )
                 
-                segment = VideoSegment(
+                segment = VideoSegment._unchecked(
                     video_filename=item["video_filename"],
                     start_time=item["start_time"],
                     end_time=item["end_time"],
@@ -137,7 +209,7 @@ class VisualFrameRepository(IFrameRepository):
                 segments.append(segment)
             
             return segments
-        except (json.JSONDecodeError, IOError, TypeError, KeyError) as e:
+        except (TypeError, KeyError) as e:
             print(f"Ошибка загрузки сегментов: {e}")
             return []
 
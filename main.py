@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 
 if getattr(sys, 'frozen', False):
     os.chdir(os.path.dirname(os.path.abspath(sys.executable)))
@@ -18,7 +19,7 @@ from oauth_config import get_client_secret_path
 
 def create_services():
     """Creates and initializes all application services"""
-    logger = ConsoleLogger()
+    logger = ConsoleLogger(debug_enabled=default_config.debug_logging)
     
     if default_config.use_windows_credential_manager:
         try:
@@ -39,17 +40,31 @@ def create_services():
     )
     docs_client = GoogleDocsClient(auth_service)
     frame_repository = VisualFrameRepository(default_config.db_file)
-    video_indexer = VideoIndexer(default_config.frames_dir)
+    video_indexer = VideoIndexer(
+        default_config.frames_dir,
+        detect_downscale=default_config.detect_downscale,
+        detect_frame_skip=default_config.detect_frame_skip,
+        scene_workers=default_config.index_scene_workers,
+        single_pass=default_config.index_single_pass,
+        scene_cache_dir=default_config.scene_cache_dir
+    )
     search_engine = ClipSearchEngine(
         frame_repository,
         cache_file=default_config.cache_file,
-        feedback_file=default_config.feedback_file
+        feedback_file=default_config.feedback_file,
+        export_text_encoders=default_config.export_text_encoders
     )
     
     indexing_service = VideoIndexingService(
         video_indexer,
         frame_repository,
-        default_config.video_folder
+        default_config.video_folder,
+        workers=default_config.index_workers,
+        checkpoint_every=default_config.index_checkpoint_every,
+        logger=logger,
+        state_file=default_config.index_state_file,
+        target_fps=default_config.index_target_fps,
+        executor=default_config.index_executor
     )
     analysis_service = DocumentAnalysisService(
         docs_client,
@@ -83,4 +98,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
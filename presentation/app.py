@@ -872,6 +872,8 @@ class App(ctk.CTk):
                 self.after(0, lambda: self.log_message(f"❌ ERROR: {data}"))
             elif msg_type == "result_found":
                 self.after(0, lambda: self.add_result_card(data))
+            elif msg_type == "results_batch":
+                self.after(0, lambda: self.add_result_cards(data))
             elif msg_type == "finished":
                 self.after(0, lambda: self.btn_run.configure(state="normal", text=_("btn_run_analysis")))
                 self.after(0, lambda: self._set_status(_("status_analysis_finished"), "#22c55e"))
@@ -953,6 +955,11 @@ class App(ctk.CTk):
             self.after(0, lambda count=success_count: self.set_indexing_state(False, count))
             self.after(0, lambda: self.btn_download.configure(state="normal", text=_("btn_download_index")))
     
+    def add_result_cards(self, batch):
+        """Adds result cards for a batch of results"""
+        for data in batch:
+            self.add_result_card(data)
+    
     def add_result_card(self, data):
         """Adds result card"""
         meta = {